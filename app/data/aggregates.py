@@ -0,0 +1,84 @@
+import logging
+import time
+import numpy as np
+import pandas as pd
+from data.schema import KEY_COLUMNS, cycle_columns
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CUBE_DIMENSIONS = ["curso", "turno", "ano", "semestre"]
+
+
+class AggregateCube:
+    """
+    Cubo de agregados curso × turno × ano × semestre × ciclo.
+
+    É materializado uma única vez por conjunto de dados carregado; os gráficos
+    consultam apenas as células do cubo (uma por combinação existente), e não o
+    DataFrame completo, a cada mudança de filtro.
+    """
+
+    def __init__(self, df):
+        start = time.perf_counter()
+        self.cycles = cycle_columns(df)
+        if not self.cycles:
+            # Planilhas fora do template: usa as colunas numéricas além das chaves
+            self.cycles = [col for col in df.columns[len(KEY_COLUMNS):]
+                           if pd.api.types.is_numeric_dtype(df[col])]
+
+        grouped = df.groupby(CUBE_DIMENSIONS, observed=True, sort=True)
+        cells = grouped[self.cycles].sum() if self.cycles else pd.DataFrame(index=grouped.size().index)
+        cells = cells.astype(np.float64)
+        cells["linhas"] = grouped.size()
+        cells["desistentes"] = cells[self.cycles].sum(axis=1) if self.cycles else 0.0
+        self.cells = cells.reset_index()
+        logging.info(f"Cubo de agregados com {len(self.cells)} células construído "
+                     f"em {time.perf_counter() - start:.3f}s.")
+
+    def _mask(self, cursos=None, ano=None, turnos=None, semestre=None):
+        mask = np.ones(len(self.cells), dtype=bool)
+        if cursos is not None:
+            mask &= self.cells["curso"].isin(list(cursos)).to_numpy()
+        if turnos is not None:
+            mask &= self.cells["turno"].isin(list(turnos)).to_numpy()
+        if ano is not None:
+            mask &= (self.cells["ano"] == ano).to_numpy()
+        if semestre is not None:
+            mask &= (self.cells["semestre"] == semestre).to_numpy()
+        return mask
+
+    def query(self, by, measure="desistentes", **filters):
+        """
+        Soma a medida (`desistentes`, `linhas` ou uma coluna de ciclo) agrupando pelas
+        dimensões `by`, considerando apenas as células que atendem aos filtros
+        (`cursos`, `turnos`, `ano`, `semestre`).
+        """
+        cells = self.cells[self._mask(**filters)]
+        by = [by] if isinstance(by, str) else list(by)
+        return cells.groupby(by, observed=True, sort=True)[measure].sum()
+
+    def is_empty(self, **filters):
+        return not self._mask(**filters).any()
+
+    def rows_by_course(self, **filters):
+        """Número de registros por curso (gráfico de distribuição)."""
+        return self.query("curso", measure="linhas", **filters)
+
+    def dropouts_by_year(self, **filters):
+        """Total de desistências por ano (gráfico de barras)."""
+        return self.query("ano", **filters)
+
+    def dropouts_by_course_year(self, **filters):
+        """Desistências por ano, uma coluna por curso (gráfico de tendência)."""
+        return self.query(["ano", "curso"], **filters).unstack("curso")
+
+    def dropouts_by_course_period(self, **filters):
+        """
+        Desistências por semestre, uma coluna por curso, indexadas pelo período
+        contínuo ano + (semestre - 1) / 2 (ex.: 2020.0 e 2020.5).
+        """
+        by_semester = self.query(["ano", "semestre", "curso"], **filters).unstack("curso")
+        anos = by_semester.index.get_level_values("ano").to_numpy(np.float64)
+        semestres = by_semester.index.get_level_values("semestre").to_numpy(np.float64)
+        by_semester.index = pd.Index(anos + (semestres - 1) / 2, name="periodo")
+        return by_semester
@@ -0,0 +1,95 @@
+import os
+import glob
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data.data_loader import DataLoader
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SUPPORTED_EXTENSIONS = ('.csv', '.txt', '.xls', '.xlsx')
+
+
+def _load_file(file_path, chunksize, local_cache_dir):
+    """Carrega e valida um único arquivo; executado nos processos do pool."""
+    start = time.perf_counter()
+    try:
+        loader = DataLoader(file_path=file_path, chunksize=chunksize, local_cache_dir=local_cache_dir)
+        df = loader.load_data()
+        return df, time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, str(e)
+
+
+class BatchLoader:
+    """
+    Carrega em paralelo um diretório (ou glob/lista) de planilhas semestrais.
+
+    Cada arquivo é interpretado e validado contra o template por um processo do
+    pool, e os resultados válidos são concatenados em um único DataFrame com a
+    coluna de origem `source_column`. O relatório traz, por arquivo, o número de
+    linhas, o tempo de carregamento e o erro, se houver.
+    """
+
+    def __init__(self, source, max_workers=None, source_column="arquivo_origem",
+                 chunksize=None, local_cache_dir=".cache_planilhas"):
+        self.source = source
+        self.max_workers = max_workers or os.cpu_count()
+        self.source_column = source_column
+        self.chunksize = chunksize
+        self.local_cache_dir = local_cache_dir
+        self.report = []
+
+    def resolve_files(self):
+        """Expande a origem em uma lista ordenada de arquivos suportados."""
+        if isinstance(self.source, (list, tuple)):
+            candidates = list(self.source)
+        elif os.path.isdir(self.source):
+            candidates = [os.path.join(self.source, name) for name in os.listdir(self.source)]
+        else:
+            candidates = glob.glob(self.source)
+        return sorted(path for path in candidates
+                      if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS))
+
+    def load(self):
+        """Carrega todos os arquivos e retorna (DataFrame consolidado, relatório por arquivo)."""
+        files = self.resolve_files()
+        if not files:
+            raise ValueError(f"Nenhuma planilha encontrada em: {self.source}")
+
+        logging.info(f"Carregando {len(files)} planilha(s) com até {self.max_workers} processo(s).")
+        start = time.perf_counter()
+        args = ([self.chunksize] * len(files), [self.local_cache_dir] * len(files))
+        if len(files) == 1 or self.max_workers == 1:
+            results = list(map(_load_file, files, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(files))) as executor:
+                results = list(executor.map(_load_file, files, *args))
+
+        frames, names, self.report = [], [], []
+        for file_path, (df, seconds, error) in zip(files, results):
+            self.report.append({
+                'arquivo': file_path,
+                'linhas': 0 if df is None else len(df),
+                'segundos': seconds,
+                'erro': error,
+            })
+            if error:
+                logging.error(f"Falha ao carregar {file_path}: {error}")
+            else:
+                frames.append(df)
+                names.append(file_path)
+
+        elapsed = time.perf_counter() - start
+        logging.info(f"{len(frames)}/{len(files)} planilha(s) carregada(s) em {elapsed:.2f}s.")
+        if not frames:
+            raise ValueError("Nenhuma planilha válida foi carregada.")
+
+        lengths = [len(df) for df in frames]
+        df = DataLoader._concat_chunks(frames, frames[0].columns)
+        if self.source_column:
+            codes = np.repeat(np.arange(len(names)), lengths)
+            df[self.source_column] = pd.Categorical.from_codes(codes, categories=names)
+        return df, self.report
@@ -0,0 +1,435 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import time
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FRAME_FORMAT_VERSION = 1
+META_FILE = "meta.json"
+# Relatório de validação (ValidationReport.to_dict) guardado junto do DataFrame
+REPORT_FILE = "validation.json"
+# Ponteiro para a versão atual de uma entrada versionada (ver `publish_version`)
+CURRENT_FILE = "current"
+
+
+# ----------------- Formato colunar em disco -----------------
+def write_frame(directory, df):
+    """
+    Grava o DataFrame em formato colunar: um arquivo .npy por coluna e um meta.json.
+
+    Colunas categóricas e de texto são gravadas como códigos inteiros + categorias,
+    e inteiros anuláveis como valores + máscara, de modo que todas as colunas
+    possam ser lidas depois via memory-map.
+    """
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        entry = {'name': col, 'file': f"{i}.npy", 'dtype': str(series.dtype)}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry['kind'] = 'category'
+            entry['categories'] = series.cat.categories.tolist()
+            entry['ordered'] = bool(series.cat.ordered)
+            values = series.cat.codes.to_numpy()
+        elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and series.dtype.kind in 'iufb':
+            entry['kind'] = 'masked'
+            entry['mask_file'] = f"{i}_mask.npy"
+            np.save(os.path.join(tmp_dir, entry['mask_file']), series.isna().to_numpy())
+            values = series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0)
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+            entry['kind'] = 'numpy'
+            values = series.to_numpy()
+        else:
+            entry['kind'] = 'object'
+            codes, uniques = pd.factorize(series)
+            entry['categories'] = uniques.tolist()
+            values = codes
+        np.save(os.path.join(tmp_dir, entry['file']), values)
+        columns.append(entry)
+
+    meta = {'format': FRAME_FORMAT_VERSION, 'rows': len(df), 'columns': columns}
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, default=str)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+
+def read_frame(directory, mmap=True):
+    """
+    Lê um DataFrame gravado por `write_frame`, mapeando as colunas numéricas em memória.
+
+    O mapeamento é copy-on-write: o DataFrame pode ser alterado normalmente, e as
+    páginas alteradas são copiadas para a memória do processo sem tocar o arquivo.
+    """
+    with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != FRAME_FORMAT_VERSION:
+        raise ValueError(f"Formato de cache incompatível em {directory}.")
+
+    mmap_mode = 'c' if mmap else None
+    data = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(directory, entry['file']), mmap_mode=mmap_mode)
+        kind = entry['kind']
+        if kind == 'category':
+            data[entry['name']] = pd.Categorical.from_codes(
+                values, categories=entry['categories'], ordered=entry['ordered'])
+        elif kind == 'masked':
+            mask = np.load(os.path.join(directory, entry['mask_file']), mmap_mode=mmap_mode)
+            if entry['dtype'] == 'boolean':
+                data[entry['name']] = pd.arrays.BooleanArray(values, mask)
+            elif entry['dtype'].startswith(('Int', 'UInt')):
+                data[entry['name']] = pd.arrays.IntegerArray(values, mask)
+            else:
+                data[entry['name']] = pd.arrays.FloatingArray(values, mask)
+        elif kind == 'numpy':
+            data[entry['name']] = values
+        else:
+            # O código -1 (valor ausente) aponta para o None acrescentado ao final
+            uniques = np.array(entry['categories'] + [None], dtype=object)
+            data[entry['name']] = pd.Series(uniques[np.asarray(values)]).astype(entry['dtype'])
+    return pd.DataFrame(data, columns=[entry['name'] for entry in meta['columns']],
+                        index=pd.RangeIndex(meta['rows']), copy=False)
+
+
+def write_report(directory, report):
+    """Grava o relatório de validação (dicionário) no diretório de uma entrada."""
+    with open(os.path.join(directory, REPORT_FILE), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, default=str)
+
+
+def read_report(directory):
+    """Lê o relatório gravado por `write_report`, ou None se não houver."""
+    try:
+        with open(os.path.join(directory, REPORT_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def new_version_dir(key_dir):
+    """
+    Diretório novo (ainda inexistente) para uma versão da entrada `key_dir`.
+
+    Cada gravação vai para um diretório próprio em vez de substituir o atual: no
+    Windows, arquivos ainda mapeados por um DataFrame carregado antes não podem
+    ser removidos nem sobrescritos.
+    """
+    return os.path.join(key_dir, f"v{time.time_ns()}-{os.getpid()}")
+
+
+def publish_version(key_dir, version_dir):
+    """Aponta atomicamente a entrada para `version_dir` e descarta as versões antigas."""
+    pointer = os.path.join(key_dir, CURRENT_FILE)
+    tmp_path = f"{pointer}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(version_dir))
+    os.replace(tmp_path, pointer)
+    prune_versions(key_dir, keep=os.path.basename(version_dir))
+
+
+def current_version_dir(key_dir):
+    """Diretório da versão atual da entrada, ou None se não houver versão publicada."""
+    try:
+        with open(os.path.join(key_dir, CURRENT_FILE), encoding='utf-8') as f:
+            version_dir = os.path.join(key_dir, f.read().strip())
+    except OSError:
+        return None
+    return version_dir if os.path.exists(os.path.join(version_dir, META_FILE)) else None
+
+
+def prune_versions(key_dir, keep=None):
+    """
+    Remove as versões diferentes de `keep`. Versões ainda mapeadas (no Windows,
+    a remoção falha) ficam para uma próxima gravação ou descarte.
+    """
+    for name in os.listdir(key_dir):
+        path = os.path.join(key_dir, name)
+        if name != keep and name.startswith('v') and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def directory_size(directory):
+    """Soma o tamanho, em bytes, dos arquivos de um diretório."""
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+# ----------------- Cache de planilhas locais -----------------
+class LocalFileCache:
+    """
+    Cache em disco de planilhas locais já interpretadas e validadas, junto com o
+    relatório de validação de cada uma.
+
+    Cada entrada é identificada pelo caminho, tamanho, data de modificação e hash
+    do conteúdo do arquivo de origem, e pela configuração de leitura (leitor,
+    tamanho de bloco e tipos declarados), já que o mesmo arquivo lido de formas
+    diferentes produz DataFrames diferentes. Cada gravação cria uma nova versão da
+    entrada (ver `publish_version`). O diretório é limitado a `max_bytes`,
+    removendo as entradas acessadas há mais tempo (LRU).
+    """
+
+    def __init__(self, cache_dir=".cache_planilhas", max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def fingerprint(self, file_path, config=None):
+        """
+        Gera a chave do arquivo a partir de caminho, tamanho, mtime e hash do
+        conteúdo, mais a configuração de leitura `config` (dicionário serializável).
+        """
+        stat = os.stat(file_path)
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                content_hash.update(block)
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{content_hash.hexdigest()}"
+        if config is not None:
+            key += f"|{json.dumps(config, sort_keys=True, default=str)}"
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Retorna o DataFrame em cache para a chave, ou None se não houver entrada válida."""
+        version_dir = current_version_dir(self._entry_dir(key))
+        if version_dir is None:
+            return None
+        try:
+            df = read_frame(version_dir)
+            # Atualiza o instante de acesso usado pela política LRU
+            os.utime(os.path.join(version_dir, META_FILE))
+            logging.info(f"Planilha carregada do cache local ({key}).")
+            return df
+        except Exception as e:
+            logging.error(f"Erro ao ler o cache local, descartando entrada: {e}")
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            return None
+
+    def get_report(self, key):
+        """Relatório de validação guardado com a entrada, ou None."""
+        version_dir = current_version_dir(self._entry_dir(key))
+        return read_report(version_dir) if version_dir is not None else None
+
+    def put(self, key, df, report=None):
+        """
+        Armazena o DataFrame (e o relatório de validação, se informado) sob a chave
+        e aplica o limite de tamanho do diretório.
+        """
+        try:
+            os.makedirs(self._entry_dir(key), exist_ok=True)
+            version_dir = new_version_dir(self._entry_dir(key))
+            write_frame(version_dir, df)
+            if report is not None:
+                write_report(version_dir, report)
+            publish_version(self._entry_dir(key), version_dir)
+            logging.info(f"Planilha armazenada no cache local ({key}).")
+            self._evict()
+        except Exception as e:
+            logging.error(f"Erro ao armazenar planilha no cache local: {e}")
+
+    def clear(self):
+        """Remove todas as entradas do cache local."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        logging.info("Cache local limpo.")
+
+    def _evict(self):
+        """Remove as entradas menos recentemente usadas até respeitar `max_bytes`."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            version_dir = current_version_dir(entry_dir) if os.path.isdir(entry_dir) else None
+            if version_dir is not None:
+                meta_path = os.path.join(version_dir, META_FILE)
+                entries.append((os.path.getmtime(meta_path), directory_size(entry_dir), entry_dir))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            logging.info(f"Entrada removida do cache local (LRU): {entry_dir}")
+
+
+# ----------------- Cache de planilhas remotas -----------------
+class SheetCacheStore:
+    """
+    Cache em disco de várias planilhas remotas, indexado por URL e aba.
+
+    A versão de cada entrada fica em um índice JSON pequeno, de modo que a
+    verificação de validade não precisa ler os dados. Os dados de cada entrada
+    ficam em um diretório próprio (formato de `write_frame`) e só são lidos sob
+    demanda. Entradas mais antigas que `max_age` segundos são descartadas e o
+    total é limitado a `max_bytes`, removendo as menos usadas.
+    """
+
+    INDEX_FILE = "index.json"
+    ROW_HASHES_FILE = "row_hashes.npy"
+
+    def __init__(self, cache_dir="data_cache", max_bytes=1024 ** 3, max_age=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    @staticmethod
+    def _key(sheet_url, worksheet):
+        return hashlib.blake2b(f"{sheet_url}|{worksheet}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _read_index(self):
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Índice do cache corrompido, recriando: {e}")
+            return {}
+
+    def _write_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = f"{index_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, index_path)
+
+    def get_version(self, sheet_url, worksheet):
+        """Retorna a versão armazenada da planilha sem carregar os dados, ou None."""
+        entry = self._read_index().get(self._key(sheet_url, worksheet))
+        if entry is None or self._is_expired(entry):
+            return None
+        return entry['version']
+
+    def load(self, sheet_url, worksheet):
+        """Carrega os dados da planilha em cache, ou None se não houver entrada."""
+        index = self._read_index()
+        key = self._key(sheet_url, worksheet)
+        entry = index.get(key)
+        if entry is None or self._is_expired(entry):
+            return None
+        try:
+            df = read_frame(self._data_dir(key, entry))
+        except Exception as e:
+            logging.error(f"Erro ao carregar dados do cache: {e}")
+            self.invalidate(sheet_url, worksheet)
+            return None
+        entry['last_access'] = time.time()
+        self._write_index(index)
+        return df
+
+    def load_row_hashes(self, sheet_url, worksheet):
+        """
+        Retorna os hashes por linha, as colunas da entrada e o instante em que as
+        linhas em cache foram conferidas por inteiro com a planilha, ou (None, None, None).
+        """
+        key = self._key(sheet_url, worksheet)
+        entry = self._read_index().get(key)
+        if entry is None or self._is_expired(entry) or not entry.get('row_hashes'):
+            return None, None, None
+        path = os.path.join(self._data_dir(key, entry), self.ROW_HASHES_FILE)
+        try:
+            return np.load(path), entry['columns'], entry.get('verified_at', entry['stored_at'])
+        except OSError:
+            return None, None, None
+
+    def load_report(self, sheet_url, worksheet):
+        """Relatório de validação guardado com a planilha, ou None."""
+        key = self._key(sheet_url, worksheet)
+        entry = self._read_index().get(key)
+        return read_report(self._data_dir(key, entry)) if entry is not None else None
+
+    def _data_dir(self, key, entry):
+        """Diretório da versão dos dados apontada pela entrada do índice."""
+        return os.path.join(self.cache_dir, key, entry['data_dir'])
+
+    def store(self, sheet_url, worksheet, df, version, row_hashes=None, report=None, verified_at=None):
+        """
+        Armazena os dados e a versão da planilha, aplicando a política de descarte.
+
+        `row_hashes`, se informado, guarda um hash por linha da planilha usado
+        pela sincronização incremental; `report`, o relatório de validação;
+        `verified_at`, quando todas as linhas foram conferidas com a planilha
+        pela última vez (padrão: agora).
+        """
+        key = self._key(sheet_url, worksheet)
+        entry_dir = os.path.join(self.cache_dir, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        # Nova versão em diretório próprio: a anterior pode estar mapeada por um
+        # DataFrame carregado antes e só é removida depois da troca no índice
+        version_dir = new_version_dir(entry_dir)
+        write_frame(version_dir, df)
+        if report is not None:
+            write_report(version_dir, report)
+        if row_hashes is not None:
+            np.save(os.path.join(version_dir, self.ROW_HASHES_FILE), np.asarray(row_hashes, dtype=np.uint64))
+
+        index = self._read_index()
+        now = time.time()
+        index[key] = {
+            'sheet_url': sheet_url,
+            'worksheet': worksheet,
+            'version': version,
+            'columns': [str(col) for col in df.columns],
+            'row_hashes': row_hashes is not None,
+            'verified_at': verified_at if verified_at is not None else now,
+            'data_dir': os.path.basename(version_dir),
+            'size': directory_size(version_dir),
+            'stored_at': now,
+            'last_access': now,
+        }
+        self._evict(index)
+        self._write_index(index)
+        prune_versions(entry_dir, keep=os.path.basename(version_dir))
+
+    def invalidate(self, sheet_url=None, worksheet=None):
+        """Remove a entrada da planilha/aba informada, ou todas se nenhuma for informada."""
+        index = self._read_index()
+        if sheet_url is None:
+            keys = list(index)
+        else:
+            keys = [key for key, entry in index.items()
+                    if entry['sheet_url'] == sheet_url and (worksheet is None or entry['worksheet'] == worksheet)]
+        for key in keys:
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            del index[key]
+        self._write_index(index)
+        logging.info(f"{len(keys)} entrada(s) removida(s) do cache de planilhas.")
+
+    def _is_expired(self, entry):
+        # Entradas do formato anterior (sem versão de dados) são tratadas como vencidas
+        if 'data_dir' not in entry:
+            return True
+        return self.max_age is not None and time.time() - entry['stored_at'] > self.max_age
+
+    def _evict(self, index):
+        """Descarta entradas expiradas e, depois, as menos usadas até respeitar `max_bytes`."""
+        for key in [key for key, entry in index.items() if self._is_expired(entry)]:
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            del index[key]
+
+        total = sum(entry['size'] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            total -= entry['size']
+            del index[key]
+            logging.info(f"Planilha removida do cache (limite de tamanho): {entry['sheet_url']}")
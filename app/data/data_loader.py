@@ -1,43 +1,92 @@
 import os
 import pandas as pd
-import gspread
 import logging
-from google.oauth2.service_account import Credentials
-import pickle
 import time
+import numpy as np
+from gspread.utils import rowcol_to_a1
+from data.schema import TEMPLATE_DTYPES
+from data.data_validator import DataValidator, ValidationError, ValidationReport
+from data.cache import LocalFileCache, SheetCacheStore
+from data.sheets_session import SheetsSession
 
 # Configuração básica de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+
+class LoadCancelled(Exception):
+    """Lançada pelo callback de progresso para interromper um carregamento."""
+
+
 class DataLoader:
-    def __init__(self, file_path=None, google_sheet_url=None, credentials_path="credentials.json", cache_file="data_cache.pkl"):
+    # Etapas do carregamento remoto informadas ao callback de progresso:
+    # versão, download, sincronização e validação/cache
+    REMOTE_STEPS = 4
+
+    def __init__(self, file_path=None, google_sheet_url=None, credentials_path="credentials.json", cache_dir="data_cache", chunksize=None,
+                 local_cache_dir=".cache_planilhas", worksheet=None, transport_factory=None,
+                 sync_mode="incremental", verify_interval=15 * 60, progress_callback=None):
         self.file_path = file_path
         self.google_sheet_url = google_sheet_url
         self.credentials_path = credentials_path
-        self.cache_file = cache_file
+        # Aba da planilha remota; None usa a primeira aba
+        self.worksheet = worksheet
+        self.sheet_cache = SheetCacheStore(cache_dir)
+        self.session = SheetsSession(credentials_path, transport_factory=transport_factory)
+        # "incremental" baixa só as linhas novas (e confere as antigas a cada `verify_interval`
+        # segundos); "full" sempre baixa e remonta a planilha inteira
+        self.sync_mode = sync_mode
+        self.verify_interval = verify_interval
+        self.chunksize = chunksize
+        # Cache colunar das planilhas locais; None desativa
+        self.local_cache = LocalFileCache(local_cache_dir) if local_cache_dir else None
+        # Chamado com (linhas lidas, bytes lidos, bytes totais); pode lançar LoadCancelled.
+        # Em planilhas remotas, os "bytes" são as etapas concluídas de REMOTE_STEPS
+        self.progress_callback = progress_callback
         self.version = None
+        self.load_stats = None
+        self.validator = DataValidator()
+        # Relatório completo da última validação (todas as violações de uma vez)
+        self.validation_report = None
 
     def load_data(self):
         logging.info("Iniciando processo de carregamento de dados.")
         if self.file_path:
             logging.info(f"Carregando dados a partir do arquivo: {self.file_path}")
             try:
+                cache_key = None
+                if self.local_cache is not None:
+                    start = time.perf_counter()
+                    cache_key = self.local_cache.fingerprint(self.file_path, self._reader_config())
+                    df = self.local_cache.get(cache_key)
+                    if df is not None:
+                        self._restore_validation(df, self.local_cache.get_report(cache_key))
+                        self._set_cache_stats(df, time.perf_counter() - start)
+                        self._report_file_done(df)
+                        return df
+
                 if self.file_path.endswith(('.xls', '.xlsx')):
                     df = pd.read_excel(self.file_path)
                     logging.info("Arquivo Excel carregado com sucesso.")
                 elif self.file_path.endswith(('.csv', '.txt')):
-                    df = pd.read_csv(self.file_path)
+                    if self.chunksize:
+                        df = self._load_csv_streaming()
+                    else:
+                        df = pd.read_csv(self.file_path)
                     logging.info("Arquivo CSV/TXT carregado com sucesso.")
                 else:
                     raise ValueError("Formato de arquivo não suportado.")
-                
-                expected_columns = ["curso", "turno", "semestre", "ano"]
-                missing_cols = [col for col in expected_columns if col not in df.columns]
-                if missing_cols:
-                    raise ValueError(f"Colunas faltantes no arquivo: {missing_cols}")
 
+                self._validate(df)
                 logging.info("Estrutura do arquivo validada com sucesso.")
+                if cache_key is not None:
+                    self.local_cache.put(cache_key, df, self.validation_report.to_dict())
+                self._report_file_done(df)
                 return df
+            except LoadCancelled:
+                logging.info("Carregamento cancelado.")
+                raise
+            except ValidationError:
+                raise
             except Exception as e:
                 logging.error(f"Erro ao processar o arquivo: {e}")
                 raise ValueError(f"Erro ao processar o arquivo: {e}")
@@ -49,91 +98,349 @@ class DataLoader:
             logging.error("Nenhuma fonte de dados fornecida.")
             raise ValueError("Nenhuma fonte de dados fornecida.")
 
+    def _reader_config(self):
+        """Configuração de leitura do arquivo local; faz parte da chave do cache local."""
+        if self.file_path.endswith(('.xls', '.xlsx')):
+            return {'reader': 'excel'}
+        if self.chunksize:
+            # Leitura em blocos aplica os tipos declarados do template
+            return {'reader': 'csv_blocos', 'chunksize': self.chunksize, 'dtypes': TEMPLATE_DTYPES}
+        return {'reader': 'csv'}
+
+    def _set_cache_stats(self, df, elapsed):
+        """Estatísticas de um carregamento servido pelo cache local."""
+        rows = len(df)
+        self.load_stats = {
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else float('inf'),
+            'peak_memory_mb': int(df.memory_usage(deep=True).sum()) / 1024 ** 2,
+            'from_cache': True,
+        }
+
+    def _load_csv_streaming(self):
+        """
+        Lê o CSV/TXT em blocos de `chunksize` linhas com os tipos declarados do template.
+
+        O cabeçalho é validado antes de qualquer linha ser interpretada, e as
+        estatísticas da leitura (linhas, linhas/s e pico de memória dos blocos
+        mantidos) ficam disponíveis em `self.load_stats`.
+        """
+        header = pd.read_csv(self.file_path, nrows=0).columns
+        missing_cols = self.validator.missing_columns(header)
+        if missing_cols:
+            raise ValueError(f"Colunas faltantes no arquivo: {missing_cols}")
+
+        dtypes = {col: dtype for col, dtype in TEMPLATE_DTYPES.items() if col in header}
+        start = time.perf_counter()
+        try:
+            chunks, rows, held_bytes, peak_bytes = self._read_chunks(dtypes)
+        except (ValueError, TypeError) as e:
+            # Valores fora do tipo declarado: relê sem tipos numéricos para que a
+            # validação aponte todas as células inválidas de uma só vez
+            logging.warning(f"Tipos inválidos no arquivo ({e}); relendo sem tipos numéricos.")
+            dtypes = {col: dtype for col, dtype in dtypes.items() if dtype == "category"}
+            chunks, rows, held_bytes, peak_bytes = self._read_chunks(dtypes)
+
+        df = self._concat_chunks(chunks, header)
+        # A concatenação mantém os blocos e o resultado vivos ao mesmo tempo
+        peak_bytes = max(peak_bytes, held_bytes + int(df.memory_usage(deep=True).sum()))
+        elapsed = time.perf_counter() - start
+
+        self.load_stats = {
+            'rows': rows,
+            'seconds': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else float('inf'),
+            'peak_memory_mb': peak_bytes / 1024 ** 2,
+            'from_cache': False,
+        }
+        logging.info(
+            f"Leitura em blocos concluída: {rows} linhas em {elapsed:.2f}s "
+            f"({self.load_stats['rows_per_sec']:.0f} linhas/s, "
+            f"pico de memória {self.load_stats['peak_memory_mb']:.1f} MB)."
+        )
+        return df
+
+    def _read_chunks(self, dtypes):
+        """Lê os blocos do arquivo; retorna (blocos, linhas, bytes mantidos, pico de bytes)."""
+        chunks = []
+        rows = 0
+        held_bytes = 0
+        peak_bytes = 0
+        total_bytes = os.path.getsize(self.file_path)
+        with open(self.file_path, 'rb') as f:
+            for chunk in pd.read_csv(f, dtype=dtypes, chunksize=self.chunksize):
+                rows += len(chunk)
+                held_bytes += int(chunk.memory_usage(deep=True).sum())
+                peak_bytes = max(peak_bytes, held_bytes)
+                chunks.append(chunk)
+                self._report_progress(rows, min(f.tell(), total_bytes), total_bytes)
+        return chunks, rows, held_bytes, peak_bytes
+
+    def _validate(self, df):
+        """
+        Valida o DataFrame inteiro de uma vez e guarda o relatório em `validation_report`.
+
+        Colunas faltantes impedem o carregamento (ValidationError); os demais
+        problemas são registrados no relatório para correção em uma única revisão.
+        """
+        self.validation_report = self.validator.validate(df)
+        if 'colunas_faltantes' in self.validation_report.rules():
+            raise ValidationError(self.validation_report)
+        if not self.validation_report.is_valid:
+            logging.warning(self.validation_report.summary())
+
+    def _restore_validation(self, df, report):
+        """
+        Restaura o relatório guardado com o DataFrame em cache, para que violações
+        continuem sendo relatadas em todo carregamento; entradas sem relatório
+        (gravadas por versões anteriores) são validadas novamente.
+        """
+        if report is None:
+            self._validate(df)
+            return
+        self.validation_report = ValidationReport.from_dict(report)
+        if not self.validation_report.is_valid:
+            logging.warning(self.validation_report.summary())
+
+    def _report_progress(self, rows, bytes_read, total_bytes):
+        if self.progress_callback is not None:
+            self.progress_callback(rows, bytes_read, total_bytes)
+
+    def _report_file_done(self, df):
+        size = os.path.getsize(self.file_path)
+        self._report_progress(len(df), size, size)
+
+    @staticmethod
+    def _concat_chunks(chunks, columns):
+        """Concatena os blocos lidos preservando as colunas categóricas."""
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+
+        # Cada bloco infere suas próprias categorias; unificá-las antes do concat
+        # evita que o pandas converta as colunas de volta para object.
+        for col in chunks[0].columns:
+            if all(col in chunk.columns and isinstance(chunk[col].dtype, pd.CategoricalDtype)
+                   for chunk in chunks):
+                categories = chunks[0][col].cat.categories
+                for chunk in chunks[1:]:
+                    categories = categories.union(chunk[col].cat.categories)
+                for chunk in chunks:
+                    chunk[col] = chunk[col].cat.set_categories(categories)
+        return pd.concat(chunks, ignore_index=True)
+
     def _load_from_google_sheets(self):
+        # Uma única autorização e um único open_by_url por carregamento
+        with self.session.load_scope():
+            return self._fetch_google_sheet()
+
+    def _fetch_google_sheet(self):
         try:
-            if self._is_cache_valid():
+            self._report_progress(0, 0, self.REMOTE_STEPS)
+            current_version = self._get_google_sheet_version()
+            self._report_progress(0, 1, self.REMOTE_STEPS)
+            if self._is_cache_valid(current_version):
                 logging.info("Carregando dados do cache.")
-                return self._load_from_cache()
-            
-            logging.info("Carregando dados do Google Sheets.")
-            scopes = [
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive"
-            ]
-            creds = Credentials.from_service_account_file(self.credentials_path, scopes=scopes)
-            client = gspread.authorize(creds)
-            logging.info("Credenciais do Google autenticadas com sucesso.")
-
-            sheet = client.open_by_url(self.google_sheet_url).sheet1
-            data = sheet.get_all_records()
-
-            if not data:
-                raise ValueError("Nenhum dado encontrado na planilha.")
+                df = self._load_from_cache()
+                if df is not None:
+                    self._restore_validation(
+                        df, self.sheet_cache.load_report(self.google_sheet_url, self._worksheet_key))
+                    self._report_progress(len(df), self.REMOTE_STEPS, self.REMOTE_STEPS)
+                    return df
+
+            sheet = self.session.worksheet(self.google_sheet_url, self.worksheet)
+            synced = None
+            if self.sync_mode == "incremental":
+                synced = self._incremental_sync(sheet)
+            if synced is None:
+                synced = self._full_sync(sheet)
+            df, row_hashes, verified_at = synced
 
-            df = pd.DataFrame(data)
+            if df.empty:
+                raise ValueError("Nenhum dado encontrado na planilha.")
             logging.info("Dados carregados da planilha com sucesso.")
+            self._report_progress(len(df), 3, self.REMOTE_STEPS)
 
-            expected_columns = ["curso", "turno", "semestre", "ano"]
-            missing_cols = [col for col in expected_columns if col not in df.columns]
-            if missing_cols:
-                raise ValueError(f"Colunas faltantes na planilha: {missing_cols}")
-            
+            self._validate(df)
             logging.info("Estrutura da planilha validada com sucesso.")
 
             # Armazenando dados no cache
-            self._store_in_cache(df)
+            self._store_in_cache(df, current_version, row_hashes, verified_at)
+            self._report_progress(len(df), self.REMOTE_STEPS, self.REMOTE_STEPS)
             return df
+        except LoadCancelled:
+            logging.info("Carregamento cancelado.")
+            raise
+        except ValidationError:
+            raise
         except Exception as e:
             logging.error(f"Erro ao carregar dados do Google Sheets: {e}")
             raise ValueError(f"Erro ao carregar dados do Google Sheets: {e}")
 
-    def _is_cache_valid(self):
-        if not os.path.exists(self.cache_file):
-            return False
+    def _full_sync(self, sheet):
+        """
+        Baixa a planilha inteira e monta o DataFrame; retorna o DataFrame, os
+        hashes de cada linha e o instante da conferência.
+        """
+        logging.info("Carregando dados do Google Sheets (leitura completa).")
+        values = sheet.get_all_values()
+        if not values:
+            raise ValueError("Nenhum dado encontrado na planilha.")
+        self._report_progress(len(values) - 1, 2, self.REMOTE_STEPS)
+        header, rows = values[0], values[1:]
+        return self._rows_to_frame(header, rows), self._hash_rows(rows, len(header)), time.time()
 
-        try:
-            with open(self.cache_file, 'rb') as cache_file:
-                cache_data = pickle.load(cache_file)
-                current_version = self._get_google_sheet_version()
-                if cache_data['version'] != current_version:
-                    logging.info("Versão da planilha alterada. Atualizando cache.")
-                    return False
-                return True
-        except Exception as e:
-            logging.error(f"Erro ao verificar a validade do cache: {e}")
+    def _incremental_sync(self, sheet):
+        """
+        Atualiza a cópia em cache baixando apenas os intervalos que podem ter mudado.
+
+        Uma única chamada `batch_get` traz o cabeçalho e as linhas após as que
+        estão em cache (o total de linhas vem da grade da aba, sem baixar dados).
+        As linhas já em cache só são baixadas e conferidas pelos hashes por linha
+        quando a última conferência tem mais de `verify_interval` segundos; assim,
+        uma edição em qualquer posição é detectada em no máximo esse intervalo.
+        Só as linhas alteradas/novas são convertidas (com os tipos das colunas do
+        cache) e mescladas ao DataFrame.
+
+        Retorna None (forçando a leitura completa) se não houver cache utilizável,
+        se o cabeçalho mudou, se a planilha perdeu linhas ou se os valores novos não
+        cabem nos tipos do cache.
+        """
+        cached_hashes, cached_columns, verified_at = self.sheet_cache.load_row_hashes(
+            self.google_sheet_url, self._worksheet_key)
+        if cached_hashes is None:
+            return None
+
+        cached_rows = len(cached_hashes)
+        width = len(cached_columns)
+        total_rows = sheet.row_count - 1
+        if total_rows < cached_rows:
+            logging.info(f"A planilha tem {total_rows} linha(s), menos que as {cached_rows} do cache. "
+                         "Executando leitura completa.")
+            return None
+
+        verify = time.time() - verified_at >= self.verify_interval
+        ranges = ['1:1']
+        if verify and cached_rows:
+            ranges.append(f"A2:{rowcol_to_a1(cached_rows + 1, width)}")
+        if total_rows > cached_rows:
+            ranges.append(f"A{cached_rows + 2}:{rowcol_to_a1(total_rows + 1, width)}")
+        fetched = sheet.batch_get(ranges)
+
+        header = list(fetched[0][0]) if fetched[0] else []
+        if len(header) > width or self._pad_rows([header], width)[0] != cached_columns:
+            logging.info("Cabeçalho da planilha alterado. Executando leitura completa.")
+            return None
+        existing = [list(row) for row in fetched[1]] if verify and cached_rows else None
+        appended = [list(row) for row in fetched[-1]] if total_rows > cached_rows else []
+        if existing is not None and len(existing) < cached_rows:
+            # Linhas finais esvaziadas: a API omite linhas vazias no fim do intervalo
+            logging.info("Linhas em cache esvaziadas na planilha. Executando leitura completa.")
+            return None
+        self._report_progress(cached_rows + len(appended), 2, self.REMOTE_STEPS)
+
+        cached = self._load_from_cache()
+        if cached is None or len(cached) != cached_rows:
+            return None
+
+        appended_hashes = self._hash_rows(appended, width)
+        if existing is not None:
+            existing_hashes = self._hash_rows(existing, width)
+            changed = np.flatnonzero(existing_hashes != cached_hashes)
+            verified_at = time.time()
+        else:
+            existing, existing_hashes = [], cached_hashes
+            changed = np.empty(0, dtype=np.intp)
+        row_hashes = np.concatenate([existing_hashes, appended_hashes])
+        logging.info(f"Sincronização incremental: {len(changed)} linha(s) alterada(s), "
+                     f"{len(appended)} nova(s){'' if verify else ' (linhas em cache não conferidas)'}.")
+        if len(changed) == 0 and not appended:
+            return cached, row_hashes, verified_at
+
+        positions = np.concatenate([changed, np.arange(cached_rows, cached_rows + len(appended))])
+        updated = self._rows_as_cached(cached, cached_columns, [existing[i] for i in changed] + appended)
+        if updated is None:
+            logging.info("Tipos das linhas novas diferem do cache. Executando leitura completa.")
+            return None
+        updated.index = positions
+        df = pd.concat([cached.drop(index=changed), updated]).sort_index().reset_index(drop=True)
+        return df, row_hashes, verified_at
+
+    def _rows_as_cached(self, cached, header, rows):
+        """
+        Converte as linhas para os tipos das colunas do DataFrame em cache, como a
+        sincronização completa faria; None se algum valor não couber no tipo.
+        """
+        raw = pd.DataFrame(self._pad_rows(rows, len(header)), columns=header, dtype=object)
+        for col in raw.columns:
+            dtype = cached[col].dtype
+            if not pd.api.types.is_numeric_dtype(dtype):
+                continue
+            values = raw[col].replace('', None)
+            converted = pd.to_numeric(values, errors='coerce')
+            if converted.notna().sum() != values.notna().sum():
+                return None
+            try:
+                raw[col] = converted.astype(dtype)
+            except (ValueError, TypeError):
+                return None
+        return raw
+
+    @staticmethod
+    def _pad_rows(rows, width):
+        # A API omite células vazias no final de cada linha
+        return [row + [''] * (width - len(row)) if len(row) < width else row[:width] for row in rows]
+
+    def _hash_rows(self, rows, width):
+        """Calcula um hash (uint64) por linha a partir dos valores brutos da planilha."""
+        if not rows:
+            return np.empty(0, dtype=np.uint64)
+        raw = pd.DataFrame(self._pad_rows(rows, width), dtype=object)
+        return pd.util.hash_pandas_object(raw, index=False).to_numpy()
+
+    def _rows_to_frame(self, header, rows):
+        """Monta o DataFrame convertendo para número as colunas inteiramente numéricas."""
+        df = pd.DataFrame(self._pad_rows(rows, len(header)), columns=header, dtype=object)
+        for col in df.columns:
+            values = df[col].replace('', None)
+            converted = pd.to_numeric(values, errors='coerce')
+            if converted.notna().sum() == values.notna().sum():
+                df[col] = converted
+        return df
+
+    @property
+    def _worksheet_key(self):
+        return self.worksheet or "sheet1"
+
+    def _is_cache_valid(self, current_version):
+        # Consulta apenas o índice do cache, sem ler os dados armazenados
+        if current_version is None:
+            return False
+        cached_version = self.sheet_cache.get_version(self.google_sheet_url, self._worksheet_key)
+        if cached_version is None:
             return False
+        if cached_version != current_version:
+            logging.info("Versão da planilha alterada. Atualizando cache.")
+            return False
+        return True
 
     def _get_google_sheet_version(self):
         try:
-            scopes = [
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive"
-            ]
-            creds = Credentials.from_service_account_file(self.credentials_path, scopes=scopes)
-            client = gspread.authorize(creds)
-
-            sheet = client.open_by_url(self.google_sheet_url).sheet1
-            version = sheet.updated
+            version = self.session.version(self.google_sheet_url, self.worksheet)
+            self.version = version
             return version
         except Exception as e:
             logging.error(f"Erro ao obter a versão da planilha: {e}")
             return None
 
     def _load_from_cache(self):
-        try:
-            with open(self.cache_file, 'rb') as cache_file:
-                cache_data = pickle.load(cache_file)
-                return cache_data['data']
-        except Exception as e:
-            logging.error(f"Erro ao carregar dados do cache: {e}")
-            raise ValueError("Erro ao carregar dados do cache.")
+        return self.sheet_cache.load(self.google_sheet_url, self._worksheet_key)
     
-    def _store_in_cache(self, df):
+    def _store_in_cache(self, df, version, row_hashes=None, verified_at=None):
         try:
-            version = self._get_google_sheet_version()
-            cache_data = {'data': df, 'version': version}
-            with open(self.cache_file, 'wb') as cache_file:
-                pickle.dump(cache_data, cache_file)
+            report = self.validation_report.to_dict() if self.validation_report is not None else None
+            self.sheet_cache.store(self.google_sheet_url, self._worksheet_key, df, version, row_hashes, report,
+                                   verified_at)
             logging.info("Dados armazenados no cache com sucesso.")
         except Exception as e:
             logging.error(f"Erro ao armazenar dados no cache: {e}")
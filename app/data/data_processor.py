@@ -1,25 +1,70 @@
+import numpy as np
 import pandas as pd
 import logging
+from data.schema import KEY_COLUMNS, cycle_columns
+from data.data_validator import DataValidator
+from data.group_index import GroupIndex
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+
+def safe_divide(numerator, denominator):
+    """Divide elemento a elemento, retornando 0 onde o denominador é zero."""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def compute_dropout_rate(df_merged, cycles, group_by=None):
+    """
+    Calcula a taxa de desistência de forma vetorizada sobre as colunas de ciclo nomeadas.
+
+    Sem `group_by`, retorna uma taxa por linha. Com `group_by` (subconjunto de
+    curso/turno/semestre/ano), soma desistentes e entradas por grupo em uma única
+    passagem e retorna a taxa agregada de cada grupo.
+    """
+    total = df_merged[cycles].to_numpy(dtype=np.float64, na_value=0).sum(axis=1)
+    entradas = df_merged["entradas"].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    if not group_by:
+        result = df_merged[["curso", "semestre", "ano"]].copy()
+        result["taxa_desistencia"] = safe_divide(total, entradas)
+        return result
+
+    totals = df_merged[list(group_by)].copy()
+    totals["total_desistentes"] = total
+    totals["entradas"] = entradas
+    result = totals.groupby(list(group_by), sort=True, observed=True).sum().reset_index()
+    result["taxa_desistencia"] = safe_divide(result["total_desistentes"], result["entradas"])
+    return result
+
 class DataProcessor:
-    def __init__(self, df, matriculados_df=None):
+    def __init__(self, df, matriculados_df=None, group_index=None):
         self.df = df
         self.matriculados_df = matriculados_df
+        # Índice de grupos do df (ver GroupIndex); construído sob demanda se ausente
+        self.group_index = group_index
+        self.memory_report = None
+        self.validation_report = None
 
     def validate_data(self):
-        """Valida se o DataFrame contém colunas essenciais e tipos adequados."""
+        """
+        Valida o DataFrame contra o template e retorna o relatório completo.
+
+        Todas as violações (colunas faltantes, valores não numéricos, contagens
+        negativas, chaves duplicadas e semestres inválidos) são coletadas de uma vez;
+        se houver alguma, lança ValidationError com o relatório.
+        """
         if self.df.empty:
             raise ValueError("DataFrame principal está vazio.")
-        expected_cols = ["curso", "semestre", "ano", "desistentes"]
-        for col in expected_cols:
-            if col not in self.df.columns:
-                raise ValueError(f"Coluna obrigatória '{col}' ausente no DataFrame.")
-        # Garantir que semestre, ano e desistentes são numéricos
-        for col in ["semestre", "ano", "desistentes"]:
-            if not pd.api.types.is_numeric_dtype(self.df[col]):
-                raise TypeError(f"Coluna '{col}' deve ser numérica.")
+        self.validation_report = DataValidator().validate(self.df)
+        return self.validation_report.raise_if_invalid()
+
+    def subset(self, **criteria):
+        """Linhas de um grupo (ex.: curso="ADS", ano=2022) sem varrer o DataFrame inteiro."""
+        if self.group_index is None or self.group_index.df is not self.df:
+            self.group_index = GroupIndex(self.df)
+        return self.group_index.subset(**criteria)
 
     def load_data(path):
         try:
@@ -44,28 +89,117 @@ class DataProcessor:
 
 
 
-    def clean_data(self):
-        """Realiza a limpeza dos dados, tratando valores faltantes e anômalos."""
+    def clean_data(self, compact=False):
+        """
+        Realiza a limpeza dos dados, tratando valores faltantes e anômalos.
+
+        O preenchimento é feito apenas nas colunas com valores faltantes, sem copiar o
+        DataFrame inteiro. Com `compact=True`, aplica também `compact()`.
+        """
+        # Cópia rasa: as colunas substituídas abaixo não alteram o DataFrame original
+        self.df = self.df.copy(deep=False)
         # Preenche valores faltantes com 0 (ou outra estratégia adequada)
-        self.df = self.df.fillna(0)
+        for col in self.df.columns:
+            series = self.df[col]
+            if not series.hasnans:
+                continue
+            if isinstance(series.dtype, pd.CategoricalDtype) and 0 not in series.cat.categories:
+                series = series.cat.add_categories([0])
+            self.df[col] = series.fillna(0)
         # Converte colunas numéricas para o tipo correto, se presentes
         for col in ["semestre", "ano", "desistentes"]:
-            if col in self.df.columns:
+            if col in self.df.columns and not pd.api.types.is_numeric_dtype(self.df[col]):
                 self.df[col] = pd.to_numeric(self.df[col], errors='coerce').fillna(0)
+        if compact:
+            self.compact()
         return self.df
 
-    def calculate_dropout_rate(self):
-        """Calcula a taxa de desistência por semestre, considerando o histórico e ciclos acadêmicos."""
+    def compact(self, categorical_columns=("curso", "turno"), max_category_ratio=0.5):
+        """
+        Reduz o uso de memória do DataFrame sem perda de informação.
+
+        - Colunas de texto viram categóricas (sempre as de `categorical_columns` e as
+          demais quando a razão valores únicos/linhas for até `max_category_ratio`);
+        - Colunas numéricas são reduzidas ao menor tipo que representa todos os valores
+          (ex.: contagens por ciclo em int8/int16).
+
+        Retorna o relatório de memória (MB antes/depois), também salvo em `memory_report`.
+        """
+        before = self.df.memory_usage(deep=True).sum()
+        self.df = self.df.copy(deep=False)
+        for col in self.df.columns:
+            self.df[col] = self._compact_column(self.df[col], col in categorical_columns, max_category_ratio)
+        after = self.df.memory_usage(deep=True).sum()
+
+        self.memory_report = {
+            'before_mb': before / 1024 ** 2,
+            'after_mb': after / 1024 ** 2,
+            'reduction_pct': 100 * (1 - after / before) if before else 0.0,
+        }
+        logging.info(
+            f"Compactação: {self.memory_report['before_mb']:.1f} MB -> "
+            f"{self.memory_report['after_mb']:.1f} MB ({self.memory_report['reduction_pct']:.0f}% menor)."
+        )
+        return self.memory_report
+
+    @staticmethod
+    def _compact_column(series, force_category, max_category_ratio):
+        """Retorna a coluna no tipo mais compacto e seguro."""
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            return series
+        if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            if force_category or series.nunique(dropna=False) <= max_category_ratio * len(series):
+                return series.astype("category")
+            return series
+        if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+            return series
+
+        is_masked = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+        if pd.api.types.is_float_dtype(dtype):
+            values = series.dropna()
+            if len(values) and (values % 1 == 0).all():
+                # Floats inteiros (ex.: 10.0 vindos do Excel) viram inteiros; com faltantes, Int anulável
+                series = series.astype("Int64") if series.hasnans else series.astype("int64")
+                is_masked = series.hasnans
+            elif not is_masked:
+                downcast = pd.to_numeric(series, downcast='float')
+                exact = np.array_equal(downcast.to_numpy(np.float64), series.to_numpy(), equal_nan=True)
+                return downcast if exact else series
+            else:
+                return series
+
+        if is_masked:
+            if series.isna().all():
+                return series
+            for candidate in ("Int8", "Int16", "Int32"):
+                info = np.iinfo(candidate.lower())
+                if series.min() >= info.min and series.max() <= info.max:
+                    return series.astype(candidate)
+            return series
+        return pd.to_numeric(series, downcast='integer')
+
+    def calculate_dropout_rate(self, group_by=None):
+        """
+        Calcula a taxa de desistência por semestre, considerando o histórico e ciclos acadêmicos.
+
+        `group_by` (ex.: ["curso", "ano"]) agrega desistentes e entradas antes do cálculo.
+        """
         if self.matriculados_df is None:
             raise ValueError("Dados de matriculados não fornecidos.")
-        required_columns = ["curso", "turno", "semestre", "ano", "entradas"]
-        for col in required_columns:
+        for col in KEY_COLUMNS:
             if col not in self.df.columns or col not in self.matriculados_df.columns:
                 raise ValueError(f"Coluna necessária '{col}' não encontrada.")
-        df_merged = self.df.merge(self.matriculados_df, on=["curso", "turno", "semestre", "ano"])
-        # Soma os desistentes em todas as colunas de desistência (supondo que estas estejam a partir da 5ª coluna até a penúltima)
-        df_merged["total_desistentes"] = df_merged.iloc[:, 4:-1].sum(axis=1)
-        # Calcula a taxa de forma segura, evitando divisão por zero
-        df_merged["taxa_desistencia"] = df_merged.apply(
-            lambda row: row["total_desistentes"] / row["entradas"] if row["entradas"] else 0, axis=1)
-        return df_merged[["curso", "semestre", "ano", "taxa_desistencia"]]
+        if "entradas" not in self.matriculados_df.columns:
+            raise ValueError("Coluna necessária 'entradas' não encontrada.")
+        if group_by is not None and not set(group_by) <= set(KEY_COLUMNS):
+            raise ValueError(f"Agrupamento inválido: {group_by}. Use colunas de {KEY_COLUMNS}.")
+
+        cycles = cycle_columns(self.df)
+        if not cycles:
+            raise ValueError("Nenhuma coluna de ciclo (ex.: '1° C') encontrada.")
+
+        # Apenas as colunas necessárias entram no merge, evitando sufixos _x/_y
+        df_merged = self.df[KEY_COLUMNS + cycles].merge(
+            self.matriculados_df[KEY_COLUMNS + ["entradas"]], on=KEY_COLUMNS)
+        return compute_dropout_rate(df_merged, cycles, group_by)
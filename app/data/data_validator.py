@@ -0,0 +1,172 @@
+import logging
+import numpy as np
+import pandas as pd
+from data.schema import EXPECTED_COLUMNS, KEY_COLUMNS, CYCLE_COLUMNS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ValidationError(ValueError):
+    """Dados fora do template; `report` traz todas as violações encontradas."""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(report.summary())
+
+
+class ValidationReport:
+    """
+    Resultado de uma validação: uma entrada por regra/coluna violada, com os
+    índices (rótulos do DataFrame) de todas as linhas afetadas.
+    """
+
+    def __init__(self, rows_checked=0):
+        self.rows_checked = rows_checked
+        self.violations = []
+
+    def add(self, rule, column, rows, message):
+        rows = np.asarray(rows)
+        self.violations.append({'regra': rule, 'coluna': column, 'linhas': rows, 'mensagem': message})
+
+    @property
+    def is_valid(self):
+        return not self.violations
+
+    def rules(self):
+        return {violation['regra'] for violation in self.violations}
+
+    def to_frame(self):
+        """Relatório em formato longo: uma linha por (regra, coluna, linha afetada)."""
+        records = []
+        for violation in self.violations:
+            rows = violation['linhas'] if len(violation['linhas']) else [None]
+            records.extend((violation['regra'], violation['coluna'], row) for row in rows)
+        return pd.DataFrame(records, columns=['regra', 'coluna', 'linha'])
+
+    def summary(self, max_rows=5):
+        """Texto com todas as violações e até `max_rows` linhas de exemplo de cada uma."""
+        if self.is_valid:
+            return f"{self.rows_checked} linhas validadas sem problemas."
+        lines = [f"{len(self.violations)} problema(s) em {self.rows_checked} linhas:"]
+        for violation in self.violations:
+            line = f"- {violation['mensagem']}"
+            rows = violation['linhas']
+            if len(rows):
+                examples = ", ".join(str(row) for row in rows[:max_rows])
+                more = f" e mais {len(rows) - max_rows}" if len(rows) > max_rows else ""
+                line += f" ({len(rows)} linha(s): {examples}{more})"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def to_dict(self):
+        """Forma serializável em JSON (ex.: para guardar junto do DataFrame em cache)."""
+        return {
+            'rows_checked': int(self.rows_checked),
+            'violations': [{**violation, 'linhas': violation['linhas'].tolist()}
+                           for violation in self.violations],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstrói o relatório gravado por `to_dict`."""
+        report = cls(data['rows_checked'])
+        for violation in data['violations']:
+            report.add(violation['regra'], violation['coluna'], violation['linhas'], violation['mensagem'])
+        return report
+
+    def raise_if_invalid(self):
+        if not self.is_valid:
+            raise ValidationError(self)
+        return self
+
+
+class DataValidator:
+    """
+    Valida um DataFrame contra o template em uma única passagem vetorizada por regra.
+
+    Ao contrário de parar no primeiro problema, coleta todas as violações:
+    colunas faltantes, valores não numéricos em ano/semestre/ciclos, contagens
+    negativas, chaves (curso, turno, ano, semestre) duplicadas e semestres fora de
+    `semesters`.
+    """
+
+    def __init__(self, required_columns=EXPECTED_COLUMNS, key_columns=KEY_COLUMNS,
+                 count_columns=CYCLE_COLUMNS, semesters=(1, 2)):
+        self.required_columns = list(required_columns)
+        self.key_columns = list(key_columns)
+        self.count_columns = list(count_columns)
+        self.semesters = list(semesters)
+
+    def missing_columns(self, columns):
+        """Colunas obrigatórias ausentes (permite validar só o cabeçalho)."""
+        return [col for col in self.required_columns if col not in columns]
+
+    def duplicated_rows(self, df):
+        """Índices de todas as linhas cuja chave (curso, turno, ano, semestre) se repete."""
+        return df.index[df.duplicated(subset=self.key_columns, keep=False).to_numpy()]
+
+    def validate(self, df, check_duplicates=True):
+        """
+        Retorna um `ValidationReport` com todas as violações do DataFrame.
+
+        `check_duplicates=False` omite a verificação de chaves duplicadas (ex.: ao
+        validar blocos isolados, em que a verificação é feita por partição).
+        """
+        report = ValidationReport(len(df))
+        missing = self.missing_columns(df.columns)
+        if missing:
+            report.add('colunas_faltantes', ", ".join(missing), [], f"Colunas faltantes: {missing}")
+
+        numeric = {}
+        for col in ["ano", "semestre"] + self.count_columns:
+            if col not in df.columns:
+                continue
+            values, invalid = self._to_numeric(df[col])
+            numeric[col] = values
+            if invalid.any():
+                report.add('nao_numerico', col, df.index[invalid],
+                           f"Valores não numéricos na coluna '{col}'")
+
+        for col in self.count_columns:
+            if col in numeric:
+                negative = (numeric[col] < 0).to_numpy(dtype=bool, na_value=False)
+                if negative.any():
+                    report.add('negativo', col, df.index[negative],
+                               f"Contagens negativas na coluna '{col}'")
+
+        if "semestre" in numeric:
+            semestre = numeric["semestre"]
+            out_of_range = (semestre.notna() & ~semestre.isin(self.semesters)).to_numpy(dtype=bool)
+            if out_of_range.any():
+                report.add('semestre_invalido', "semestre", df.index[out_of_range],
+                           f"Semestres fora de {self.semesters}")
+
+        if check_duplicates and not self.missing_columns(df.columns):
+            self.add_duplicates(report, self.duplicated_rows(df))
+
+        if report.is_valid:
+            logging.info(f"Validação concluída: {len(df)} linhas sem problemas.")
+        else:
+            logging.warning(f"Validação encontrou {len(report.violations)} problema(s) em {len(df)} linhas.")
+        return report
+
+    def add_duplicates(self, report, rows):
+        """Registra no relatório as linhas com chave duplicada."""
+        if len(rows):
+            report.add('chave_duplicada', ", ".join(self.key_columns), rows,
+                       f"Chaves ({', '.join(self.key_columns)}) duplicadas")
+
+    @staticmethod
+    def _to_numeric(series):
+        """Converte para número; retorna os valores e a máscara de células inválidas."""
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            return series, np.zeros(len(series), dtype=bool)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        # Células vazias (ex.: "" vindo do Google Sheets) contam como faltantes, não inválidas
+        present = series.notna()
+        if pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+            present &= series.astype(str).str.strip().ne("")
+        values = pd.to_numeric(series.where(present), errors='coerce')
+        invalid = (present & values.isna()).to_numpy(dtype=bool)
+        return values, invalid
@@ -0,0 +1,111 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+import matplotlib
+from data.schema import KEY_COLUMNS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class GroupIndex:
+    """
+    Índice de grupos do DataFrame carregado, construído uma única vez por carga.
+
+    Cada coluna indexada (por padrão curso, turno, semestre e ano) recebe códigos
+    estáveis (posição do valor na lista ordenada de valores distintos), usados
+    também para as cores. Para cada combinação de colunas consultada, as linhas são
+    ordenadas uma vez pelo código do grupo; a partir daí, obter os deslocamentos
+    (posições) das linhas de um grupo custa O(tamanho do grupo), e não O(linhas)
+    como uma máscara booleana sobre o DataFrame inteiro.
+    """
+
+    def __init__(self, df, columns=KEY_COLUMNS, colormap="Set3"):
+        start = time.perf_counter()
+        self.df = df
+        self.columns = [col for col in columns if col in df.columns]
+        self.codes = {}
+        self.categories = {}
+        self._lookup = {}
+        for col in self.columns:
+            # Valores ausentes formam um grupo próprio (último código)
+            codes, uniques = pd.factorize(df[col], sort=True, use_na_sentinel=False)
+            self.codes[col] = codes.astype(np.int32)
+            self.categories[col] = uniques
+            self._lookup[col] = {value: code for code, value in enumerate(uniques.tolist())}
+        # (colunas) -> (ordem das linhas, início de cada grupo, chaves dos grupos, formato)
+        self._groups = {}
+        self.colormap = colormap
+        self._palettes = {}
+        logging.info(f"Índice de grupos ({', '.join(self.columns)}) construído em "
+                     f"{time.perf_counter() - start:.3f}s.")
+
+    def __len__(self):
+        return len(self.df)
+
+    def values(self, column):
+        """Valores distintos da coluna, na ordem dos códigos."""
+        return self.categories[column].tolist()
+
+    def code(self, column, value):
+        """Código estável do valor na coluna (ou -1 se não existir)."""
+        return self._lookup[column].get(value, -1)
+
+    def palette(self, column="curso"):
+        """Cores (RGBA), uma por valor distinto da coluna, na ordem dos códigos."""
+        if column not in self._palettes:
+            count = len(self.categories[column])
+            self._palettes[column] = matplotlib.colormaps[self.colormap](np.linspace(0, 1, max(count, 1)))
+        return self._palettes[column]
+
+    def color(self, value, column="curso"):
+        """Cor estável do valor (a mesma em todos os gráficos enquanto os dados não mudarem)."""
+        code = self.code(column, value)
+        if code < 0:
+            raise ValueError(f"Valor '{value}' não encontrado na coluna '{column}'.")
+        return self.palette(column)[code]
+
+    def _group(self, columns):
+        columns = tuple(columns)
+        if columns not in self._groups:
+            missing = [col for col in columns if col not in self.codes]
+            if missing:
+                raise ValueError(f"Coluna(s) não indexada(s): {missing}")
+            shape = [len(self.categories[col]) for col in columns]
+            flat = np.ravel_multi_index([self.codes[col] for col in columns], shape)
+            order = np.argsort(flat, kind='stable')
+            keys, starts = np.unique(flat[order], return_index=True)
+            starts = np.append(starts, len(order))
+            self._groups[columns] = (order, starts, keys, shape)
+        return self._groups[columns]
+
+    def rows(self, **criteria):
+        """
+        Posições das linhas do grupo definido por `criteria` (ex.: curso="ADS",
+        ano=2022), em ordem crescente; vazio se o grupo não existir.
+        """
+        missing = [col for col in criteria if col not in self.codes]
+        if missing:
+            raise ValueError(f"Coluna(s) não indexada(s): {missing}")
+        columns = tuple(sorted(criteria, key=self.columns.index))
+        order, starts, keys, shape = self._group(columns)
+        codes = [self.code(col, criteria[col]) for col in columns]
+        if min(codes, default=0) < 0:
+            return np.empty(0, dtype=np.int64)
+        key = np.ravel_multi_index(codes, shape)
+        position = np.searchsorted(keys, key)
+        if position == len(keys) or keys[position] != key:
+            return np.empty(0, dtype=np.int64)
+        return order[starts[position]:starts[position + 1]]
+
+    def subset(self, **criteria):
+        """Linhas do DataFrame pertencentes ao grupo definido por `criteria`."""
+        return self.df.iloc[self.rows(**criteria)]
+
+    def groups(self, *columns):
+        """Percorre (chave, posições das linhas) de cada grupo das colunas informadas."""
+        order, starts, keys, shape = self._group(columns)
+        for i, key in enumerate(keys):
+            codes = np.unravel_index(key, shape)
+            values = tuple(self.categories[col][code] for col, code in zip(columns, codes))
+            yield values, order[starts[i]:starts[i + 1]]
@@ -0,0 +1,218 @@
+import os
+import glob
+import time
+import shutil
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from data.schema import KEY_COLUMNS, cycle_columns
+from data.cache import read_frame, META_FILE
+from data.data_processor import DataProcessor, compute_dropout_rate, safe_divide
+from data.data_validator import DataValidator, ValidationReport
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def iter_chunks(source, chunksize=500_000):
+    """
+    Percorre uma fonte de dados em blocos de DataFrame.
+
+    `source` pode ser um DataFrame, um iterador de DataFrames (ex.: `pd.read_csv(...,
+    chunksize=...)`), um arquivo CSV/TXT (lido em blocos) ou um diretório colunar
+    gravado por `cache.write_frame` (colunas mapeadas em memória e fatiadas por bloco).
+    Os índices dos blocos são contínuos, identificando a linha de origem.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, str) and os.path.isfile(os.path.join(source, META_FILE)):
+        df = read_frame(source, mmap=True)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    elif isinstance(source, str):
+        if not source.endswith(('.csv', '.txt')):
+            raise ValueError(f"Formato não suportado para processamento em blocos: {source}")
+        yield from pd.read_csv(source, chunksize=chunksize)
+    else:
+        offset = 0
+        for chunk in source:
+            # Iteradores arbitrários: renumera para manter índices contínuos
+            chunk = chunk.set_axis(pd.RangeIndex(offset, offset + len(chunk)))
+            offset += len(chunk)
+            yield chunk
+
+
+def partition_ids(df, partitions):
+    """Partição de cada linha pelo hash de (curso, turno, semestre, ano)."""
+    # Tipos normalizados: a mesma chave precisa do mesmo hash em qualquer bloco/tabela
+    keys = pd.DataFrame({
+        "curso": df["curso"].astype(str).to_numpy(dtype=object),
+        "turno": df["turno"].astype(str).to_numpy(dtype=object),
+        "semestre": pd.to_numeric(df["semestre"]).to_numpy(dtype=np.int64),
+        "ano": pd.to_numeric(df["ano"]).to_numpy(dtype=np.int64),
+    })
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return (hashes % np.uint64(partitions)).astype(np.int64)
+
+
+class OutOfCoreProcessor:
+    """
+    Modo fora da memória do DataProcessor: limpeza, validação, merge e taxa de
+    desistência sobre dados maiores que a RAM.
+
+    As duas tabelas (desistências e matriculados) são lidas em blocos, limpas e
+    distribuídas em `partitions` partições em disco pelo hash da chave (curso,
+    turno, semestre, ano). Como a mesma chave sempre cai na mesma partição, o merge
+    e a detecção de chaves duplicadas são feitos partição a partição, mantendo em
+    memória apenas uma partição de cada tabela por vez.
+    """
+
+    def __init__(self, df_source, matriculados_source=None, work_dir=None, partitions=16, chunksize=500_000):
+        if partitions < 1:
+            raise ValueError("O número de partições deve ser positivo.")
+        self.df_source = df_source
+        self.matriculados_source = matriculados_source
+        self.partitions = partitions
+        self.chunksize = chunksize
+        self._own_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="evasao_ooc_")
+        self.validation_report = None
+        self.stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+    def cleanup(self):
+        """Remove as partições gravadas (e o diretório de trabalho temporário)."""
+        if self._own_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        else:
+            for name in ("dados", "matriculados"):
+                shutil.rmtree(os.path.join(self.work_dir, name), ignore_errors=True)
+
+    def _partition_dir(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def partition(self, name, source, validator=None):
+        """
+        Limpa cada bloco de `source` e grava suas linhas nas partições de `name`.
+
+        Com `validator`, valida cada bloco (exceto chaves duplicadas, verificadas
+        por partição) e retorna o relatório acumulado.
+        """
+        directory = self._partition_dir(name)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        start = time.perf_counter()
+        report = ValidationReport()
+        rows = 0
+        for number, chunk in enumerate(iter_chunks(source, self.chunksize)):
+            rows += len(chunk)
+            missing = [col for col in KEY_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"Colunas faltantes em '{name}': {missing}")
+            if validator is not None:
+                self._merge_reports(report, validator.validate(chunk, check_duplicates=False))
+            chunk = DataProcessor(chunk).clean_data()
+            for part, piece in chunk.groupby(partition_ids(chunk, self.partitions), sort=False):
+                piece.to_pickle(os.path.join(directory, f"part-{part:04d}-{number:06d}.pkl"))
+        report.rows_checked = rows
+        self.stats[name] = {'linhas': rows, 'segundos': time.perf_counter() - start}
+        logging.info(f"{rows} linhas de '{name}' distribuídas em {self.partitions} partições "
+                     f"({self.stats[name]['segundos']:.2f}s).")
+        return report
+
+    def load_partition(self, name, part):
+        """Lê uma partição inteira de `name` (ou None se estiver vazia)."""
+        files = sorted(glob.glob(os.path.join(self._partition_dir(name), f"part-{part:04d}-*.pkl")))
+        if not files:
+            return None
+        pieces = [pd.read_pickle(path) for path in files]
+        return pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+
+    def validate(self):
+        """
+        Valida a tabela principal inteira sem carregá-la na memória e retorna o
+        relatório completo (também salvo em `validation_report`). Também deixa a
+        tabela particionada para `calculate_dropout_rate`.
+        """
+        validator = DataValidator()
+        report = self.partition("dados", self.df_source, validator)
+        # Linhas com a mesma chave estão sempre na mesma partição
+        duplicated = [validator.duplicated_rows(df) for df in
+                      (self.load_partition("dados", part) for part in range(self.partitions))
+                      if df is not None]
+        if duplicated:
+            validator.add_duplicates(report, np.sort(np.concatenate([np.asarray(rows) for rows in duplicated])))
+        self.validation_report = report
+        return report
+
+    def calculate_dropout_rate(self, group_by=None, output_path=None):
+        """
+        Calcula a taxa de desistência com merge particionado em (curso, turno, semestre, ano).
+
+        Sem `group_by`, as taxas por linha são gravadas em `output_path` (CSV,
+        incrementalmente) quando informado, ou concatenadas e retornadas. Com
+        `group_by`, cada partição produz somas parciais de desistentes e entradas,
+        combinadas ao final (o resultado tem uma linha por grupo).
+        """
+        if self.matriculados_source is None:
+            raise ValueError("Dados de matriculados não fornecidos.")
+        if group_by is not None and not set(group_by) <= set(KEY_COLUMNS):
+            raise ValueError(f"Agrupamento inválido: {group_by}. Use colunas de {KEY_COLUMNS}.")
+
+        start = time.perf_counter()
+        if not os.path.isdir(self._partition_dir("dados")):
+            self.partition("dados", self.df_source)
+        self.partition("matriculados", self.matriculados_source)
+
+        results = []
+        header = True
+        for part in range(self.partitions):
+            df = self.load_partition("dados", part)
+            matriculados = self.load_partition("matriculados", part)
+            if df is None or matriculados is None:
+                continue
+            cycles = cycle_columns(df)
+            if not cycles:
+                raise ValueError("Nenhuma coluna de ciclo (ex.: '1° C') encontrada.")
+            if "entradas" not in matriculados.columns:
+                raise ValueError("Coluna necessária 'entradas' não encontrada.")
+            merged = df[KEY_COLUMNS + cycles].merge(matriculados[KEY_COLUMNS + ["entradas"]], on=KEY_COLUMNS)
+            result = compute_dropout_rate(merged, cycles, group_by)
+            if output_path is not None and not group_by:
+                result.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+                header = False
+            else:
+                results.append(result)
+
+        self.stats['taxa'] = {'segundos': time.perf_counter() - start}
+        logging.info(f"Taxa de desistência fora da memória calculada em {self.stats['taxa']['segundos']:.2f}s.")
+        if output_path is not None and not group_by:
+            return output_path
+        if not results:
+            columns = list(group_by) + ["total_desistentes", "entradas"] if group_by else ["curso", "semestre", "ano"]
+            return pd.DataFrame(columns=columns + ["taxa_desistencia"])
+        combined = pd.concat(results, ignore_index=True)
+        if not group_by:
+            return combined
+        # Combina as somas parciais de cada partição e recalcula a taxa agregada
+        totals = combined.groupby(list(group_by), sort=True, observed=True)[["total_desistentes", "entradas"]].sum()
+        totals = totals.reset_index()
+        totals["taxa_desistencia"] = safe_divide(totals["total_desistentes"], totals["entradas"])
+        return totals
+
+    @staticmethod
+    def _merge_reports(report, other):
+        """Acumula as violações de `other` em `report`, unindo as linhas por regra/coluna."""
+        for violation in other.violations:
+            for existing in report.violations:
+                if existing['regra'] == violation['regra'] and existing['coluna'] == violation['coluna']:
+                    existing['linhas'] = np.concatenate([existing['linhas'], violation['linhas']])
+                    break
+            else:
+                report.add(violation['regra'], violation['coluna'], violation['linhas'], violation['mensagem'])
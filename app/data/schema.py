@@ -0,0 +1,27 @@
+"""Definições do template de dados compartilhadas entre carregamento e processamento."""
+
+# Colunas que identificam um registro (curso, turno e período)
+KEY_COLUMNS = ["curso", "turno", "semestre", "ano"]
+
+# Colunas mínimas exigidas em qualquer planilha carregada
+EXPECTED_COLUMNS = ["curso", "turno", "semestre", "ano"]
+
+# Colunas de desistências por ciclo, na ordem do template.csv
+CYCLE_COLUMNS = ["1° C", "2° C", "3° C", "4° C", "5° C", "6° C"]
+
+TEMPLATE_COLUMNS = KEY_COLUMNS + CYCLE_COLUMNS
+
+# Tipos declarados para leitura tipada do template. Inteiros anuláveis (Int8/Int16)
+# permitem células vazias sem promover a coluna inteira para float64.
+TEMPLATE_DTYPES = {
+    "curso": "category",
+    "turno": "category",
+    "semestre": "Int8",
+    "ano": "Int16",
+    **{col: "Int16" for col in CYCLE_COLUMNS},
+}
+
+
+def cycle_columns(df):
+    """Retorna as colunas de ciclo do template presentes no DataFrame, na ordem do template."""
+    return [col for col in CYCLE_COLUMNS if col in df.columns]
@@ -0,0 +1,116 @@
+import os
+import logging
+import threading
+from contextlib import contextmanager
+import gspread
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive"
+]
+
+
+class SheetsSession:
+    """
+    Sessão autenticada com o Google Sheets reaproveitada entre carregamentos.
+
+    O cliente gspread é autorizado uma única vez por arquivo de credenciais e
+    compartilhado por todas as instâncias (inclusive a sessão HTTP). Dentro de
+    `load_scope()`, a planilha aberta, a aba e a versão (`updated`) são
+    memorizadas, evitando novas chamadas `open_by_url` durante um mesmo
+    carregamento.
+
+    `transport_factory` recebe as credenciais e retorna um objeto compatível com
+    `requests.Session`; permite apontar o cliente para um servidor falso local.
+    """
+
+    _clients = {}
+    _lock = threading.Lock()
+
+    def __init__(self, credentials_path, transport_factory=None):
+        self.credentials_path = credentials_path
+        self.transport_factory = transport_factory
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._versions = {}
+
+    @property
+    def client(self):
+        """Cliente gspread autorizado, criado apenas na primeira utilização."""
+        return self._authorized()[0]
+
+    @property
+    def request_count(self):
+        """Total de requisições HTTP feitas pelo cliente compartilhado."""
+        return self._authorized()[1]['requests']
+
+    def _authorized(self):
+        path = os.path.abspath(self.credentials_path)
+        key = (path, os.path.getmtime(path), self.transport_factory)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = self._authorize()
+            return self._clients[key]
+
+    def _authorize(self):
+        creds = Credentials.from_service_account_file(self.credentials_path, scopes=SCOPES)
+        if self.transport_factory is not None:
+            transport = self.transport_factory(creds)
+        else:
+            transport = AuthorizedSession(creds)
+
+        counter = {'requests': 0}
+
+        def count_response(response, *args, **kwargs):
+            counter['requests'] += 1
+            return response
+
+        transport.hooks.setdefault('response', []).append(count_response)
+        logging.info("Credenciais do Google autenticadas com sucesso.")
+        return gspread.Client(auth=creds, session=transport), counter
+
+    def open(self, sheet_url):
+        """Abre a planilha pela URL, reaproveitando o handle dentro do carregamento."""
+        if sheet_url not in self._spreadsheets:
+            self._spreadsheets[sheet_url] = self.client.open_by_url(sheet_url)
+        return self._spreadsheets[sheet_url]
+
+    def worksheet(self, sheet_url, worksheet=None):
+        """Retorna a aba informada (ou a primeira) da planilha."""
+        key = (sheet_url, worksheet)
+        if key not in self._worksheets:
+            spreadsheet = self.open(sheet_url)
+            self._worksheets[key] = spreadsheet.worksheet(worksheet) if worksheet else spreadsheet.sheet1
+        return self._worksheets[key]
+
+    def version(self, sheet_url, worksheet=None):
+        """Retorna o instante da última alteração da planilha, memorizado no carregamento."""
+        key = (sheet_url, worksheet)
+        if key not in self._versions:
+            sheet = self.worksheet(sheet_url, worksheet)
+            if hasattr(sheet, 'updated'):
+                version = sheet.updated
+            else:
+                # gspread >= 6 expõe a data de modificação apenas na planilha
+                version = self.open(sheet_url).get_lastUpdateTime()
+            self._versions[key] = version
+        return self._versions[key]
+
+    def reset(self):
+        """Descarta os handles e versões memorizados."""
+        self._spreadsheets.clear()
+        self._worksheets.clear()
+        self._versions.clear()
+
+    @contextmanager
+    def load_scope(self):
+        """Delimita um carregamento: memoriza os handles e os descarta ao final."""
+        self.reset()
+        try:
+            yield self
+        finally:
+            self.reset()
@@ -0,0 +1,216 @@
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.model_selection import KFold
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+import time
+import logging
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from data.group_index import GroupIndex
+from prediction.prediction import Predictor
+from prediction.model_registry import hash_arrays, hash_config
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _fit_group(group, X, y, candidates, cv):
+    """
+    Escolhe o melhor candidato de um grupo por validação cruzada e o treina em
+    todos os dados do grupo. Retorna (grupo, resultado).
+    """
+    start = time.perf_counter()
+    # Ao menos 2 linhas por fold de teste, para o R² ser definido
+    folds = list(KFold(n_splits=max(2, min(cv, len(y) // 2))).split(X))
+    best_name, best_score = None, float('-inf')
+    for name, pipeline in candidates.items():
+        scores = []
+        for train, test in folds:
+            fold_model = clone(pipeline)
+            fold_model.fit(X[train], y[train])
+            scores.append(r2_score(y[test], fold_model.predict(X[test])))
+        score = float(np.mean(scores))
+        if best_name is None or score > best_score:
+            best_name, best_score = name, score
+    model = clone(candidates[best_name]).fit(X, y)
+    return group, {
+        'model': model,
+        'modelo': best_name,
+        'cv_r2': best_score,
+        'linhas': len(y),
+        'segundos': time.perf_counter() - start,
+    }
+
+
+class GroupedForecaster:
+    """
+    Previsão de desistências por grupo (por padrão, curso e turno).
+
+    As linhas de cada grupo vêm do GroupIndex (sem máscaras sobre o DataFrame
+    inteiro). Para cada grupo, os candidatos são avaliados por validação cruzada e
+    o melhor é treinado nos dados do grupo; os grupos são distribuídos pelo joblib
+    entre `n_jobs` workers. Cada grupo guarda a impressão digital dos seus dados
+    (hash de features, alvo e candidatos): em uma nova execução, só os grupos cujos
+    dados mudaram são retreinados. Com `registry`, os modelos por grupo também são
+    reaproveitados entre sessões.
+    """
+
+    GROUP_COLUMNS = ("curso", "turno")
+
+    def __init__(self, df, group_columns=GROUP_COLUMNS, group_index=None, models=None,
+                 cv=3, min_rows=6, n_jobs=-1, backend="loky", registry=None):
+        self.group_columns = tuple(group_columns)
+        missing = [col for col in self.group_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Colunas de grupo ausentes: {missing}")
+        # Candidatos baratos o bastante para centenas de grupos pequenos
+        if models is None:
+            models = {
+                'Linear': LinearRegression(),
+                'Ridge': Ridge(),
+                'KNN': KNeighborsRegressor(n_neighbors=3),
+            }
+        self.candidates = {name: Predictor.make_pipeline(model) for name, model in models.items()}
+        self.cv = cv
+        self.min_rows = min_rows
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.registry = registry
+        # grupo -> resultado do último treino (modelo, candidato escolhido, métricas)
+        self.results = {}
+        # grupo -> impressão digital dos dados usados nesse treino
+        self.fingerprints = {}
+        self.fit_seconds = None
+        self.set_data(df, group_index)
+
+    def set_data(self, df, group_index=None):
+        """Troca os dados; os grupos inalterados não são retreinados no próximo `fit`."""
+        self.df = df
+        self.group_index = group_index if group_index is not None else GroupIndex(df)
+        self.X, self.y = Predictor(df).prepare_data()
+
+    def _config(self):
+        return {
+            'features': Predictor.FEATURE_CONFIG,
+            'cv': self.cv,
+            'candidates': {name: {'class': type(model).__name__, 'params': model.get_params(deep=True)}
+                           for name, model in self.candidates.items()},
+        }
+
+    def fit(self):
+        """
+        Treina os grupos novos ou alterados e retorna o relatório por grupo
+        (ver `report`). O tempo total fica em `fit_seconds`.
+        """
+        start = time.perf_counter()
+        config_hash = hash_config(self._config())
+        current = {}
+        pending = []
+        skipped = 0
+        for group, rows in self.group_index.groups(*self.group_columns):
+            if len(rows) < self.min_rows:
+                skipped += 1
+                continue
+            fingerprint = hash_config({'data': hash_arrays(self.X[rows], self.y[rows]), 'config': config_hash})
+            current[group] = fingerprint
+            if self.fingerprints.get(group) == fingerprint:
+                self.results[group]['reaproveitado'] = True
+                continue
+            entry = self.registry.load(fingerprint) if self.registry is not None else None
+            if entry is not None:
+                model, metrics = entry
+                self.results[group] = {'model': model, 'modelo': list(self.candidates)[int(metrics['candidato'])],
+                                       'cv_r2': metrics['cv_r2'], 'linhas': int(metrics['linhas']),
+                                       'segundos': metrics['segundos'], 'reaproveitado': True}
+                self.fingerprints[group] = fingerprint
+                continue
+            pending.append((group, rows))
+        if skipped:
+            logging.warning(f"{skipped} grupo(s) com menos de {self.min_rows} linhas ignorado(s).")
+
+        # Grupos que deixaram de existir nos dados
+        for group in set(self.results) - set(current):
+            self.results.pop(group)
+            self.fingerprints.pop(group, None)
+
+        outputs = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+            delayed(_fit_group)(group, self.X[rows], self.y[rows], self.candidates, self.cv)
+            for group, rows in pending
+        ) if pending else []
+        for group, result in outputs:
+            self.results[group] = {**result, 'reaproveitado': False}
+            self.fingerprints[group] = current[group]
+            if self.registry is not None:
+                self.registry.store(current[group], result['model'],
+                                    {'candidato': list(self.candidates).index(result['modelo']),
+                                     'cv_r2': result['cv_r2'], 'linhas': result['linhas'],
+                                     'segundos': result['segundos']},
+                                    name=f"grupo: {' / '.join(map(str, group))}", data_hash=current[group])
+
+        self.fit_seconds = time.perf_counter() - start
+        latencies = [result['segundos'] for group, result in outputs]
+        if latencies:
+            logging.info(f"{len(outputs)} de {len(current)} grupo(s) treinado(s) em {self.fit_seconds:.2f}s "
+                         f"(latência por grupo: média {np.mean(latencies) * 1000:.1f} ms, "
+                         f"p95 {np.percentile(latencies, 95) * 1000:.1f} ms).")
+        else:
+            logging.info(f"Nenhum grupo alterado; {len(current)} grupo(s) reaproveitado(s) "
+                         f"em {self.fit_seconds:.2f}s.")
+        return self.report()
+
+    def report(self):
+        """Uma linha por grupo: candidato escolhido, R² de validação, linhas, latência do treino."""
+        records = [
+            {**dict(zip(self.group_columns, group)),
+             **{key: value for key, value in result.items() if key != 'model'}}
+            for group, result in self.results.items()
+        ]
+        columns = [*self.group_columns, 'modelo', 'cv_r2', 'linhas', 'segundos', 'reaproveitado']
+        return pd.DataFrame.from_records(records, columns=columns)
+
+    def forecast(self, future_periods):
+        """
+        Tabela de previsões de todos os grupos: uma linha por grupo, ano e semestre
+        de `future_periods`, com o modelo usado e seu R² de validação.
+        """
+        if self.fit_seconds is None:
+            self.fit()
+        future = Predictor.future_rows(future_periods)
+        frames = []
+        for group, result in self.results.items():
+            frame = pd.DataFrame({
+                **dict(zip(self.group_columns, group)),
+                'ano': future[:, 0].astype(int),
+                'semestre': future[:, 1].astype(int),
+                'previsao': result['model'].predict(future),
+                'modelo': result['modelo'],
+                'cv_r2': result['cv_r2'],
+            })
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=[*self.group_columns, 'ano', 'semestre', 'previsao', 'modelo', 'cv_r2'])
+        return pd.concat(frames, ignore_index=True)
+
+    def predict_batch(self, rows):
+        """
+        Previsão para linhas (ano, semestre, <colunas de grupo>) usando o modelo de
+        cada grupo; grupos sem modelo recebem NaN.
+        """
+        if self.fit_seconds is None:
+            self.fit()
+        if isinstance(rows, pd.DataFrame):
+            keys = rows[list(self.group_columns)].itertuples(index=False, name=None)
+        else:
+            array = np.asarray(rows, dtype=object)
+            keys = map(tuple, array[:, 2:2 + len(self.group_columns)])
+        X = Predictor.feature_matrix(rows)
+        positions = {}
+        for position, key in enumerate(keys):
+            positions.setdefault(key, []).append(position)
+        predictions = np.full(len(X), np.nan)
+        for group, group_positions in positions.items():
+            result = self.results.get(group)
+            if result is not None:
+                predictions[group_positions] = result['model'].predict(X[group_positions])
+        return predictions
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import joblib
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def hash_arrays(*arrays):
+    """Hash do conteúdo (formato, tipo e bytes) de arrays NumPy."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.shape}|{array.dtype.str}|".encode('utf-8'))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def hash_config(config):
+    """Hash estável de uma configuração (dicionário serializável em JSON)."""
+    payload = json.dumps(config, sort_keys=True, default=repr)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ModelRegistry:
+    """
+    Registro em disco de modelos treinados e suas métricas de validação cruzada.
+
+    Cada entrada é identificada pelo hash dos dados de treino, da configuração de
+    features e dos hiperparâmetros do modelo; assim, o mesmo conjunto de dados não
+    é retreinado a cada análise. Os modelos ficam em arquivos `joblib` e as
+    métricas em um índice JSON pequeno. O total é limitado a `max_bytes`,
+    descartando as entradas menos usadas.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, registry_dir="model_registry", max_bytes=512 * 1024 ** 2):
+        self.registry_dir = registry_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(data_hash, feature_config, model):
+        """Chave da entrada: dados + configuração de features + classe e hiperparâmetros."""
+        params = {'class': type(model).__name__, 'params': model.get_params(deep=True)}
+        return hash_config({'data': data_hash, 'features': feature_config, 'model': params})
+
+    def _model_path(self, key):
+        return os.path.join(self.registry_dir, f"{key}.joblib")
+
+    def _read_index(self):
+        index_path = os.path.join(self.registry_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Índice do registro de modelos corrompido, recriando: {e}")
+            return {}
+
+    def _write_index(self, index):
+        os.makedirs(self.registry_dir, exist_ok=True)
+        index_path = os.path.join(self.registry_dir, self.INDEX_FILE)
+        tmp_path = f"{index_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, index_path)
+
+    def load(self, key):
+        """Retorna (modelo treinado, métricas) da entrada, ou None se não existir."""
+        index = self._read_index()
+        entry = index.get(key)
+        if entry is None:
+            return None
+        try:
+            model = joblib.load(self._model_path(key))
+        except Exception as e:
+            logging.error(f"Erro ao carregar modelo do registro: {e}")
+            self._remove(index, key)
+            self._write_index(index)
+            return None
+        entry['last_access'] = time.time()
+        self._write_index(index)
+        return model, entry['metrics']
+
+    def store(self, key, model, metrics, name=None, data_hash=None):
+        """Grava o modelo treinado e suas métricas, aplicando a política de descarte."""
+        os.makedirs(self.registry_dir, exist_ok=True)
+        path = self._model_path(key)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+
+        index = self._read_index()
+        now = time.time()
+        index[key] = {
+            'name': name or type(model).__name__,
+            'data_hash': data_hash,
+            'metrics': {metric: float(value) for metric, value in metrics.items()},
+            'size': os.path.getsize(path),
+            'stored_at': now,
+            'last_access': now,
+        }
+        self._evict(index)
+        self._write_index(index)
+
+    def invalidate(self, data_hash=None, name=None):
+        """
+        Remove as entradas dos dados `data_hash` e/ou do modelo `name`; sem
+        argumentos, esvazia o registro.
+        """
+        index = self._read_index()
+        keys = [key for key, entry in index.items()
+                if (data_hash is None or entry['data_hash'] == data_hash)
+                and (name is None or entry['name'] == name)]
+        for key in keys:
+            self._remove(index, key)
+        self._write_index(index)
+        logging.info(f"{len(keys)} modelo(s) removido(s) do registro.")
+
+    def _remove(self, index, key):
+        try:
+            os.remove(self._model_path(key))
+        except OSError:
+            pass
+        index.pop(key, None)
+
+    def _evict(self, index):
+        """Descarta as entradas menos usadas até respeitar `max_bytes`."""
+        total = sum(entry['size'] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= entry['size']
+            self._remove(index, key)
+            logging.info(f"Modelo removido do registro (limite de tamanho): {entry['name']}")
@@ -1,79 +1,394 @@
 from sklearn.linear_model import LinearRegression, Ridge, Lasso
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.neighbors import KNeighborsRegressor
-from sklearn.model_selection import cross_val_score
+from sklearn.model_selection import KFold, ParameterGrid
+from sklearn.base import clone
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.preprocessing import StandardScaler, PolynomialFeatures
 from sklearn.pipeline import Pipeline
+import time
+import logging
+from collections import namedtuple
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from joblib import Parallel, delayed
+from prediction.model_registry import hash_arrays
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Combinação de modelo e hiperparâmetros avaliada por `Predictor.search_models`
+Candidate = namedtuple('Candidate', ['name', 'params', 'regressor'])
+
+
+def _fit_and_score(model, X, y, train, test):
+    """Treina uma cópia do modelo em um fold e retorna (R² no teste, segundos)."""
+    start = time.perf_counter()
+    fold_model = clone(model)
+    fold_model.fit(X[train], y[train])
+    score = r2_score(y[test], fold_model.predict(X[test]))
+    return score, time.perf_counter() - start
+
+
+def _fit_full(model, X, y):
+    """Treina o modelo em todos os dados e retorna (modelo treinado, segundos)."""
+    start = time.perf_counter()
+    model.fit(X, y)
+    return model, time.perf_counter() - start
+
+
+def _fit_transform_fold(pipeline, X, y, train, test):
+    """Ajusta as etapas de features do Pipeline no treino do fold e transforma treino e teste."""
+    features = clone(pipeline[:-1])
+    return features.fit_transform(X[train], y[train]), features.transform(X[test])
+
+
+def _score_candidate(regressor, X_train, y_train, X_test, y_test):
+    """
+    R² de um regressor (com hiperparâmetros já definidos) em um fold de features
+    pré-transformadas, ou None se o regressor não puder ser ajustado.
+    """
+    try:
+        model = clone(regressor).fit(X_train, y_train)
+        return r2_score(y_test, model.predict(X_test))
+    except ValueError:
+        # Ex.: KNN com mais vizinhos que linhas no orçamento atual
+        return None
+
 
 class Predictor:
-    def __init__(self, df):
+    # Configuração de features; faz parte da chave dos modelos no registro
+    FEATURE_CONFIG = {
+        'features': ["ano", "semestre"],
+        'target': "soma das colunas a partir da 5ª",
+        'polynomial_degree': 2,
+        'scaler': "StandardScaler",
+    }
+
+    # Grade de hiperparâmetros do regressor usada por `search_models`
+    SEARCH_SPACE = {
+        'Linear': {},
+        'Ridge': {'alpha': [0.01, 0.1, 1.0, 10.0, 100.0]},
+        'Lasso': {'alpha': [0.01, 0.1, 1.0, 10.0, 100.0]},
+        'RandomForest': {'n_estimators': [50, 100, 200], 'max_depth': [None, 5, 10]},
+        'GradientBoosting': {'learning_rate': [0.05, 0.1, 0.2], 'max_depth': [2, 3]},
+        'KNN': {'n_neighbors': [3, 5, 10, 20], 'weights': ['uniform', 'distance']},
+    }
+    # Parâmetros reduzidos na mesma proporção da amostra nas rodadas iniciais da
+    # busca: o custo de florestas é dominado pelo número de árvores, e a média de
+    # menos árvores continua uma estimativa sem viés do desempenho da floresta
+    BUDGET_PARAMS = {'RandomForest': 'n_estimators'}
+    # Abaixo destes limites o successive halving custa mais do que economiza:
+    # amostras de poucas linhas não separam bem os candidatos, e com poucos
+    # candidatos não há o que descartar
+    HALVING_MIN_ROWS = 8000
+    HALVING_MIN_CANDIDATES = 6
+
+    def __init__(self, df, group_index=None, n_jobs=-1, backend="loky", registry=None):
         self.df = df
+        # Paralelismo do treino (joblib): -1 usa todos os núcleos; backend "loky"
+        # (processos) ou "threading"
+        self.n_jobs = n_jobs
+        self.backend = backend
+        # Registro em disco de modelos treinados (ver ModelRegistry); None desativa
+        self.registry = registry
+        # Índice de grupos do df, usado para treinar por curso/turno sem máscaras
+        self.group_index = group_index
+        # Cada modelo é um Pipeline (features polinomiais + normalização + regressor),
+        # ajustado uma única vez no treino e reutilizado sem reajuste na inferência
         self.models = {
-            'Linear': LinearRegression(),
-            'Ridge': Ridge(),
-            'Lasso': Lasso(),
-            'RandomForest': RandomForestRegressor(),
-            'GradientBoosting': GradientBoostingRegressor(),
-            'KNN': KNeighborsRegressor()
+            'Linear': self.make_pipeline(LinearRegression()),
+            'Ridge': self.make_pipeline(Ridge()),
+            'Lasso': self.make_pipeline(Lasso()),
+            'RandomForest': self.make_pipeline(RandomForestRegressor()),
+            'GradientBoosting': self.make_pipeline(GradientBoostingRegressor()),
+            'KNN': self.make_pipeline(KNeighborsRegressor())
         }
         self.best_model = None
         self.best_score = float('-inf')
+        self.training_seconds = None
+
+    def for_group(self, **criteria):
+        """Novo Predictor restrito a um grupo (ex.: curso="ADS", turno="Noite")."""
+        if self.group_index is None:
+            from data.group_index import GroupIndex
+            self.group_index = GroupIndex(self.df)
+        return Predictor(self.group_index.subset(**criteria))
+
+    @classmethod
+    def make_pipeline(cls, regressor):
+        """Pipeline de features (interações polinomiais + normalização) seguido do regressor."""
+        return Pipeline([
+            ('poly', PolynomialFeatures(degree=cls.FEATURE_CONFIG['polynomial_degree'], include_bias=False)),
+            ('scaler', StandardScaler()),
+            ('regressor', regressor),
+        ])
 
     def prepare_data(self):
+        """Retorna as features brutas (ano, semestre) e o alvo; as transformações ficam nos Pipelines."""
         # Feature engineering: soma colunas a partir da 5ª
-        X_raw = self.df[["ano", "semestre"]].values
-        y = self.df.iloc[:, 4:].sum(axis=1).values
+        X = self.df[self.FEATURE_CONFIG['features']].to_numpy(np.float64)
+        y = self.df.iloc[:, 4:].sum(axis=1).to_numpy(np.float64)
+        return X, y
+
+    @classmethod
+    def feature_matrix(cls, rows):
+        """
+        Converte linhas (ano, semestre[, curso, turno]) na matriz de features do modelo.
 
-        # Feature interaction: combinações polinomiais + normalização
-        poly = PolynomialFeatures(degree=2, include_bias=False)
-        X_poly = poly.fit_transform(X_raw)
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X_poly)
+        Aceita um DataFrame (colunas pelo nome) ou um array/lista de linhas em que
+        as duas primeiras posições são ano e semestre. Curso e turno não fazem parte
+        das features do modelo global e são ignorados aqui.
+        """
+        features = cls.FEATURE_CONFIG['features']
+        if isinstance(rows, pd.DataFrame):
+            missing = [col for col in features if col not in rows.columns]
+            if missing:
+                raise ValueError(f"Colunas necessárias ausentes: {missing}")
+            return rows[features].to_numpy(np.float64)
+        array = np.asarray(rows, dtype=object)
+        if array.ndim != 2 or array.shape[1] < len(features):
+            raise ValueError("As linhas devem ter ao menos (ano, semestre).")
+        return array[:, :len(features)].astype(np.float64)
 
-        return X_scaled, y
+    @staticmethod
+    def future_rows(future_periods):
+        """Linhas (ano, semestre) de cada semestre dos anos informados."""
+        return np.array([[year, sem] for year in future_periods for sem in [1, 2]], dtype=np.float64)
 
     def train_models(self, cv=5):
+        """
+        Treina e avalia todos os modelos com validação cruzada em `cv` folds.
+
+        Cada par (modelo, fold) e cada treino final é uma tarefa independente,
+        distribuída pelo joblib entre `n_jobs` workers. Com o backend "loky", `X` e
+        `y` maiores que o limite `max_nbytes` do joblib (1 MB por padrão) são
+        mapeados em memória e compartilhados entre os processos; abaixo disso, são
+        copiados para cada tarefa, o que nesse tamanho custa pouco. Além das
+        métricas, cada resultado traz os tempos de validação cruzada e de treino do
+        modelo.
+
+        Com `registry`, modelos já treinados com os mesmos dados, features e
+        hiperparâmetros são carregados do disco em vez de retreinados.
+        """
         X, y = self.prepare_data()
         results = {}
+        start = time.perf_counter()
 
-        for name, model in self.models.items():
-            # Cross-validation
-            scores = cross_val_score(model, X, y, cv=cv, scoring='r2')
-            model.fit(X, y)
-            y_pred = model.predict(X)
+        # Modelos já treinados com os mesmos dados, features e hiperparâmetros
+        cached = {}
+        keys = {}
+        if self.registry is not None:
+            data_hash = hash_arrays(X, y)
+            feature_config = {**self.FEATURE_CONFIG, 'cv': cv}
+            for name, model in self.models.items():
+                keys[name] = self.registry.make_key(data_hash, feature_config, model)
+                entry = self.registry.load(keys[name])
+                if entry is not None:
+                    cached[name] = entry
+        pending = [name for name in self.models if name not in cached]
+
+        # Mesmos folds que cross_val_score(cv=cv) usa para regressores
+        folds = list(KFold(n_splits=cv).split(X))
+        tasks = [(name, fold) for name in pending for fold in range(len(folds))]
+        tasks += [(name, None) for name in pending]
+        outputs = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+            delayed(_fit_and_score)(self.models[name], X, y, *folds[fold]) if fold is not None
+            else delayed(_fit_full)(self.models[name], X, y)
+            for name, fold in tasks
+        ) if tasks else []
+        scores = {name: [] for name in pending}
+        cv_seconds = {name: 0.0 for name in pending}
+        fitted = {}
+        for (name, fold), output in zip(tasks, outputs):
+            if fold is None:
+                fitted[name] = output
+            else:
+                scores[name].append(output[0])
+                cv_seconds[name] += output[1]
+
+        for name in self.models:
+            if name in cached:
+                model, metrics = cached[name]
+                self.models[name] = model
+                results[name] = {'model': model, **metrics, 'from_registry': True}
+            else:
+                # Com processos, o modelo treinado volta como cópia
+                model, fit_seconds = fitted[name]
+                self.models[name] = model
+                y_pred = model.predict(X)
 
-            results[name] = {
+                results[name] = {
+                    'model': model,
+                    'r2': r2_score(y, y_pred),
+                    'mae': mean_absolute_error(y, y_pred),
+                    'mse': mean_squared_error(y, y_pred),
+                    'cv_r2_mean': np.mean(scores[name]),
+                    'cv_r2_std': np.std(scores[name]),
+                    'cv_seconds': cv_seconds[name],
+                    'fit_seconds': fit_seconds,
+                    'from_registry': False,
+                }
+                if self.registry is not None:
+                    metrics = {metric: value for metric, value in results[name].items()
+                               if metric not in ('model', 'from_registry')}
+                    self.registry.store(keys[name], model, metrics, name=name, data_hash=data_hash)
+
+            if results[name]['cv_r2_mean'] > self.best_score:
+                self.best_score = results[name]['cv_r2_mean']
+                self.best_model = model
+
+        self.training_seconds = time.perf_counter() - start
+        return results
+
+    def search_models(self, cv=5, factor=3, search_space=None, min_resources=None, random_state=0):
+        """
+        Seleção de modelos e hiperparâmetros por successive halving.
+
+        Todas as combinações de `search_space` (por padrão `SEARCH_SPACE`) começam
+        avaliadas por validação cruzada em uma amostra pequena dos dados; a cada
+        rodada só o melhor 1/`factor` segue, e a amostra cresce `factor` vezes. O
+        número de rodadas é escolhido para que ao menos dois finalistas cheguem à
+        última rodada, que usa todos os dados e os mesmos folds de `train_models`;
+        entre eles, `best_model`/`best_score` são escolhidos da mesma forma: maior
+        R² médio de validação cruzada, com o Pipeline vencedor treinado em todos
+        os dados. Candidatos que não podem ser ajustados em uma amostra (ex.: KNN
+        com mais vizinhos que linhas) são descartados e registrados no histórico.
+
+        Em cada rodada, os folds e as features transformadas (polinomiais +
+        normalização) de cada fold são calculados uma vez e compartilhados por
+        todos os candidatos; só os regressores são ajustados por candidato. Nas
+        rodadas iniciais, os parâmetros de `BUDGET_PARAMS` também são reduzidos
+        na proporção da amostra. O histórico das rodadas fica em `search_history`.
+
+        Sem `min_resources`, o halving é dispensado em entradas pequenas: com até
+        `HALVING_MIN_CANDIDATES` combinações, todas são avaliadas em uma única
+        rodada com todas as linhas; com menos de `HALVING_MIN_ROWS` linhas, cada
+        modelo de `search_space` é avaliado uma vez com seus hiperparâmetros
+        padrão, como em `train_models`.
+        """
+        X, y = self.prepare_data()
+        start = time.perf_counter()
+        search_space = self.SEARCH_SPACE if search_space is None else search_space
+        unknown = [name for name in search_space if name not in self.models]
+        if unknown:
+            raise ValueError(f"Modelo(s) desconhecido(s) em search_space: {unknown}. "
+                             f"Use um de {list(self.models)}.")
+        if not search_space:
+            raise ValueError("search_space vazio.")
+        candidates = [
+            Candidate(name, params, clone(self.models[name][-1]).set_params(**params))
+            for name, grid in search_space.items()
+            for params in ParameterGrid(grid)
+        ]
+        template = self.models[next(iter(search_space))]
+
+        # Orçamentos crescentes de linhas, terminando em todas as linhas; rodadas
+        # suficientes para reduzir os candidatos sem deixar menos de 2 na última
+        n_rounds = int(np.floor(np.log(max(len(candidates) / 2, 1)) / np.log(factor))) + 1
+        if min_resources is None:
+            if len(candidates) <= self.HALVING_MIN_CANDIDATES:
+                n_rounds = 1
+            elif len(y) < self.HALVING_MIN_ROWS:
+                logging.info(f"Apenas {len(y)} linhas: busca de hiperparâmetros dispensada, "
+                             "cada modelo é avaliado com os parâmetros padrão.")
+                candidates = [Candidate(name, {}, clone(self.models[name][-1])) for name in search_space]
+                n_rounds = 1
+            min_resources = max(len(y) // factor ** (n_rounds - 1), 2 * cv)
+        budgets = [min(min_resources * factor ** i, len(y)) for i in range(n_rounds - 1)] + [len(y)]
+        # Amostras aninhadas; a ordem original das linhas é mantida para que, com
+        # todas as linhas, os folds sejam exatamente os de train_models
+        permutation = np.random.default_rng(random_state).permutation(len(y))
+
+        history = []
+        survivors = list(range(len(candidates)))
+        for round_number, budget in enumerate(budgets):
+            rows = np.sort(permutation[:budget])
+            X_budget, y_budget = X[rows], y[rows]
+            folds = list(KFold(n_splits=cv).split(X_budget))
+            regressors = {index: self._budget_regressor(candidates[index], budget / len(y))
+                          for index in survivors}
+            transformed = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+                delayed(_fit_transform_fold)(template, X_budget, y_budget, train, test)
+                for train, test in folds
+            )
+            tasks = [(index, fold) for index in survivors for fold in range(len(folds))]
+            outputs = Parallel(n_jobs=self.n_jobs, backend=self.backend)(
+                delayed(_score_candidate)(regressors[index], transformed[fold][0],
+                                          y_budget[folds[fold][0]], transformed[fold][1],
+                                          y_budget[folds[fold][1]])
+                for index, fold in tasks
+            )
+            scores = {index: [] for index in survivors}
+            for (index, fold), score in zip(tasks, outputs):
+                scores[index].append(score)
+            fitted = []
+            for index in survivors:
+                candidate = candidates[index]
+                entry = {'rodada': round_number, 'linhas': budget, 'modelo': candidate.name,
+                         'parametros': candidate.params}
+                if any(score is None for score in scores[index]):
+                    history.append({**entry, 'cv_r2_mean': np.nan, 'cv_r2_std': np.nan,
+                                    'status': 'falha no ajuste'})
+                    continue
+                fitted.append(index)
+                history.append({**entry, 'cv_r2_mean': np.mean(scores[index]),
+                                'cv_r2_std': np.std(scores[index]), 'status': 'avaliado'})
+            if not fitted:
+                raise ValueError(f"Nenhum candidato pôde ser ajustado com {budget} linhas.")
+            survivors = fitted
+            if round_number < len(budgets) - 1:
+                ranked = sorted(survivors, key=lambda index: np.mean(scores[index]), reverse=True)
+                survivors = ranked[:max(len(ranked) // factor, min(len(ranked), 2))]
+        self.search_history = pd.DataFrame(history)
+
+        # Finalistas: treinados em todos os dados, como em train_models
+        results = {}
+        for index in survivors:
+            name, params, regressor = candidates[index]
+            model = self.make_pipeline(regressor).fit(X, y)
+            y_pred = model.predict(X)
+            label = f"{name}({', '.join(f'{key}={value}' for key, value in params.items())})" if params else name
+            results[label] = {
                 'model': model,
+                'params': params,
                 'r2': r2_score(y, y_pred),
                 'mae': mean_absolute_error(y, y_pred),
                 'mse': mean_squared_error(y, y_pred),
-                'cv_r2_mean': np.mean(scores),
-                'cv_r2_std': np.std(scores)
+                'cv_r2_mean': np.mean(scores[index]),
+                'cv_r2_std': np.std(scores[index]),
             }
-
-            if results[name]['cv_r2_mean'] > self.best_score:
-                self.best_score = results[name]['cv_r2_mean']
+            if results[label]['cv_r2_mean'] > self.best_score:
+                self.best_score = results[label]['cv_r2_mean']
                 self.best_model = model
 
+        self.training_seconds = time.perf_counter() - start
         return results
 
-    def predict(self, future_periods):
-        if self.best_model is None:
-            self.train_models()
+    def _budget_regressor(self, candidate, fraction):
+        """Regressor do candidato com os parâmetros de `BUDGET_PARAMS` reduzidos à fração `fraction`."""
+        param = self.BUDGET_PARAMS.get(candidate.name)
+        if param is None or fraction >= 1:
+            return candidate.regressor
+        full = candidate.regressor.get_params()[param]
+        return clone(candidate.regressor).set_params(**{param: max(int(full * fraction), min(full, 10))})
 
-        future_X_raw = np.array([[year, sem]
-                                 for year in range(2024, 2027)
-                                 for sem in [1, 2]])
+    def predict(self, future_periods):
+        """Previsão do melhor modelo para os dois semestres de cada ano em `future_periods`."""
+        return self.predict_batch(self.future_rows(future_periods))
 
-        poly = PolynomialFeatures(degree=2, include_bias=False)
-        future_poly = poly.fit_transform(future_X_raw)
-        scaler = StandardScaler()
-        future_scaled = scaler.fit_transform(future_poly)
+    def predict_batch(self, rows, model=None):
+        """
+        Previsão vetorizada para qualquer conjunto de linhas (ano, semestre[, curso, turno]).
 
-        return self.best_model.predict(future_scaled)
+        Usa o Pipeline já ajustado (por padrão, o melhor modelo): as features são
+        transformadas e previstas em uma única chamada, sem reajustar nada.
+        """
+        if model is None:
+            if self.best_model is None:
+                self.train_models()
+            model = self.best_model
+        return model.predict(self.feature_matrix(rows))
 
     def plot_predictions(self, future_years):
         results = self.train_models()
@@ -81,31 +396,17 @@ class Predictor:
         plt.figure(figsize=(12, 8))
 
         # Dados históricos
-        X_raw = self.df[["ano", "semestre"]].values
-        y = self.df.iloc[:, 4:].sum(axis=1).values
+        X_raw, y = self.prepare_data()
         X_plot = X_raw[:, 0] + X_raw[:, 1] / 2
         plt.scatter(X_plot, y, color='black', label='Dados Históricos', alpha=0.6)
 
         # Futuro
-        future_X_raw = np.array([[year, sem]
-                                 for year in future_years
-                                 for sem in [1, 2]])
-        future_plot_x = np.array([year + sem / 2
-                                 for year in future_years
-                                 for sem in [1, 2]])
-
-        # Feature transform
-        poly = PolynomialFeatures(degree=2, include_bias=False)
-        X_poly_all = poly.fit_transform(np.vstack((X_raw, future_X_raw)))
-        scaler = StandardScaler()
-        X_scaled_all = scaler.fit_transform(X_poly_all)
-
-        X_scaled = X_scaled_all[:len(X_raw)]
-        future_scaled = X_scaled_all[len(X_raw):]
+        future_X_raw = self.future_rows(future_years)
+        future_plot_x = future_X_raw[:, 0] + future_X_raw[:, 1] / 2
 
         for name, result in results.items():
-            model = result['model']
-            future_y = model.predict(future_scaled)
+            # Pipelines ajustados no treino: apenas transformam e preveem
+            future_y = self.predict_batch(future_X_raw, model=result['model'])
 
             plt.plot(future_plot_x, future_y, '--', label=f"{name} (CV R²: {result['cv_r2_mean']:.2f})")
 
@@ -1,20 +1,41 @@
 import pandas as pd
 from PyQt5.QtGui import QColor, QPainter
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QEvent
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QTabWidget, QPushButton, 
                            QScrollArea, QCheckBox, QGridLayout)
 from PyQt5.QtChart import QChart, QChartView, QPieSeries, QBarSeries, QBarSet, QValueAxis, QBarCategoryAxis
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import numpy as np
+from data.aggregates import AggregateCube
+from data.group_index import GroupIndex
+from ui.figures import FigureManager, setup_trend_axes
+from ui.downsampling import lttb, visible_window, bucket_years
+
+# Largura mínima (px) de cada barra antes de agrupar anos em faixas
+MIN_BAR_WIDTH = 12
+# Espaçamento mínimo (px) entre pontos da tendência (diâmetro do marcador); abaixo
+# dele os marcadores se sobrepõem e a série é reduzida com LTTB
+MIN_POINT_SPACING = 8
 
 class Dashboard(QWidget):
-    def __init__(self, data, parent=None):
+    def __init__(self, data, parent=None, group_index=None):
         super().__init__(parent)
         self.df = data if data is not None else pd.DataFrame()
         self.selected_courses = set(self.df["curso"].unique())
-        self.colors = plt.cm.Set3(np.linspace(0, 1, len(self.df["curso"].unique())))
+        # Códigos e cores estáveis por curso/ano; normalmente já construído na carga
+        if group_index is None and not self.df.empty:
+            group_index = GroupIndex(self.df)
+        self.group_index = group_index
+        # Agregados materializados uma vez; os filtros consultam apenas o cubo
+        self.cube = AggregateCube(self.df) if not self.df.empty else None
         self.dark_mode = False
+        # Uma figura por canvas, reaproveitada entre atualizações e temas
+        self.figures = FigureManager()
+        self._update_pending = False
+        self.filters = {}
+        # Abas com dados desatualizados: renderizadas apenas quando ficarem visíveis
+        self.dirty_tabs = set()
         self.initUI()
     def initUI(self):
         if self.df.empty:
@@ -34,7 +55,7 @@ class Dashboard(QWidget):
         self.year_filter = QComboBox()
         self.year_filter.addItem("Todos os anos")
         self.year_filter.addItems([str(ano) for ano in sorted(self.df["ano"].unique())])
-        self.year_filter.currentIndexChanged.connect(self.updateCharts)
+        self.year_filter.currentIndexChanged.connect(self.schedule_update)
         filter_layout.addWidget(year_label)
         filter_layout.addWidget(self.year_filter)
         layout.addLayout(filter_layout)
@@ -44,20 +65,29 @@ class Dashboard(QWidget):
         course_widget = QWidget()
         course_layout = QGridLayout()
         
+        self.course_checkboxes = {}
         for i, curso in enumerate(sorted(self.df["curso"].unique())):
             cb = QCheckBox(curso)
             cb.setChecked(True)
-            cb.stateChanged.connect(self.updateCharts)
+            cb.stateChanged.connect(self.schedule_update)
             course_layout.addWidget(cb, i // 3, i % 3)
+            self.course_checkboxes[curso] = cb
         
         course_widget.setLayout(course_layout)
         scroll.setWidget(course_widget)
         scroll.setWidgetResizable(True)
         layout.addWidget(scroll)
         
-        # Container para gráficos: usa QTabWidget para organizar os gráficos
+        # Container para gráficos: usa QTabWidget para organizar os gráficos.
+        # Os gráficos são criados uma única vez e atualizados a cada filtro.
         self.tab_widget = QTabWidget()
         layout.addWidget(self.tab_widget)
+        # Cada aba associa seu widget à função que a atualiza a partir dos filtros
+        self.tab_renderers = {}
+        self.create_pie_chart()
+        self.create_bar_chart()
+        self.create_line_chart()
+        self.tab_widget.currentChanged.connect(self.render_current_tab)
         
         # Botão para exportar gráficos
         export_btn = QPushButton("Exportar Gráficos")
@@ -66,109 +96,288 @@ class Dashboard(QWidget):
         
         self.setLayout(layout)
         self.updateCharts()
+
+    def schedule_update(self, *args):
+        """Agrupa rajadas de sinais (ex.: vários checkboxes) em uma única atualização."""
+        if not self._update_pending:
+            self._update_pending = True
+            QTimer.singleShot(0, self.updateCharts)
         
     def updateCharts(self):
+        self._update_pending = False
         # Atualiza lista de cursos selecionados
-        self.selected_courses = set()
-        for cb in self.findChildren(QCheckBox):
-            if cb.isChecked():
-                self.selected_courses.add(cb.text())
-        
-        # Filtra os dados inicialmente pela seleção de cursos
-        df_filtered = self.df[self.df["curso"].isin(self.selected_courses)]
+        self.selected_courses = {curso for curso, cb in self.course_checkboxes.items() if cb.isChecked()}
         
-        # Filtro avançado: aplicar filtro por ano, se selecionado
+        # Filtros: seleção de cursos e, se selecionado, ano
+        filters = {"cursos": self.selected_courses}
         selected_year = self.year_filter.currentText() if hasattr(self, "year_filter") else "Todos os anos"
         if selected_year != "Todos os anos":
-            df_filtered = df_filtered[df_filtered["ano"] == int(selected_year)]
-        
-        # Limpa tabs existentes
-        while self.tab_widget.count() > 0:
-            self.tab_widget.removeTab(0)
-            
-        # Recria gráficos com dados filtrados
-        if not df_filtered.empty:
-            # Gráfico de Pizza
-            pie_chart = self.create_pie_chart(df_filtered)
-            pie_view = QChartView(pie_chart)
-            pie_view.setRenderHint(QPainter.Antialiasing)
-            self.tab_widget.addTab(pie_view, "Distribuição por Curso")
-            
-            # Gráfico de Barras
-            bar_chart = self.create_bar_chart(df_filtered)
-            bar_view = QChartView(bar_chart)
-            bar_view.setRenderHint(QPainter.Antialiasing)
-            self.tab_widget.addTab(bar_view, "Desistências por Ano")
-            
-            # Gráfico de Linha com Matplotlib
-            line_chart = self.create_line_chart(df_filtered)
-            self.tab_widget.addTab(line_chart, "Tendência Temporal")
-
-    def create_pie_chart(self, df):
-        series = QPieSeries()
-        for i, curso in enumerate(sorted(df["curso"].unique())):
-            count = df[df["curso"] == curso].shape[0]
-            slice = series.append(curso, count)
-            # Define a cor do slice usando a paleta já carregada
-            color = self.colors[list(self.df["curso"].unique()).index(curso)]
-            slice.setBrush(QColor(plt.matplotlib.colors.rgb2hex(color)))
+            filters["ano"] = int(selected_year)
         
+        self.filters = filters
+        # Sem dados filtrados, oculta os gráficos em vez de destruí-los
+        has_data = not self.cube.is_empty(**filters)
+        self.tab_widget.setVisible(has_data)
+        # Apenas a aba visível é recalculada; as demais ficam marcadas como sujas
+        self.dirty_tabs = set(self.tab_renderers)
+        if has_data:
+            self.render_current_tab()
+
+    def add_chart_tab(self, widget, title, renderer):
+        """Adiciona uma aba cujo conteúdo é renderizado sob demanda por `renderer`."""
+        self.tab_renderers[widget] = renderer
+        self.dirty_tabs.add(widget)
+        self.tab_widget.addTab(widget, title)
+
+    def render_current_tab(self, *args):
+        """Renderiza a aba visível se seus dados estiverem desatualizados."""
+        widget = self.tab_widget.currentWidget()
+        if widget in self.dirty_tabs and not self.cube.is_empty(**self.filters):
+            self.tab_renderers[widget]()
+            self.dirty_tabs.discard(widget)
+
+    def render_all_tabs(self):
+        """Renderiza todas as abas pendentes (ex.: antes de exportar)."""
+        if self.cube.is_empty(**self.filters):
+            return
+        for widget in list(self.dirty_tabs):
+            self.tab_renderers[widget]()
+        self.dirty_tabs.clear()
+
+    def course_color(self, curso):
+        return QColor(plt.matplotlib.colors.rgb2hex(self.group_index.color(curso)))
+
+    def create_pie_chart(self):
+        """Cria o gráfico de pizza (distribuição por curso) e sua aba."""
+        self.pie_series = QPieSeries()
+        self.pie_slices = {}
         chart = QChart()
-        chart.addSeries(series)
+        chart.addSeries(self.pie_series)
         chart.setTitle("Distribuição de Cursos")
         chart.legend().setAlignment(Qt.AlignRight)
-        return chart
-    def create_bar_chart(self, df):
+        pie_view = QChartView(chart)
+        pie_view.setRenderHint(QPainter.Antialiasing)
+        self.add_chart_tab(pie_view, "Distribuição por Curso",
+                           lambda: self.update_pie_chart(self.cube.rows_by_course(**self.filters)))
+
+    def update_pie_chart(self, counts):
+        """Atualiza apenas as fatias que mudaram a partir do número de registros por curso."""
+        for curso in list(self.pie_slices):
+            if curso not in counts.index:
+                self.pie_series.remove(self.pie_slices.pop(curso))
+        for curso, count in counts.items():
+            slice = self.pie_slices.get(curso)
+            if slice is None:
+                slice = self.pie_series.append(curso, int(count))
+                # Define a cor do slice usando a paleta já carregada
+                slice.setBrush(self.course_color(curso))
+                self.pie_slices[curso] = slice
+            elif slice.value() != count:
+                slice.setValue(int(count))
+
+    def create_bar_chart(self):
+        """Cria o gráfico de barras (desistências por ano) e sua aba."""
         chart = QChart()
-        series = QBarSeries()
-        
-        anos = sorted(df["ano"].unique())
-        for i, ano in enumerate(anos):
-            bar_set = QBarSet(str(ano))
-            # Soma as desistências considerando as colunas a partir da 5ª coluna
-            desistentes = df[df["ano"] == ano].iloc[:, 4:].sum().sum()
-            bar_set.append(desistentes)
-            color = self.colors[i % len(self.colors)]
-            bar_set.setColor(QColor(plt.matplotlib.colors.rgb2hex(color)))
-            series.append(bar_set)
-            
-        chart.addSeries(series)
+        self.bar_series = QBarSeries()
+        self.bar_sets = {}
+        chart.addSeries(self.bar_series)
         chart.setTitle("Desistências por Ano")
         
         axis_x = QBarCategoryAxis()
         axis_x.append(["Total"])
         chart.addAxis(axis_x, Qt.AlignBottom)
         
-        axis_y = QValueAxis()
-        chart.addAxis(axis_y, Qt.AlignLeft)
-        series.attachAxis(axis_y)
-    
-        return chart
-        
-    def create_line_chart(self, df):
-        # Cria gráfico de linha usando Matplotlib
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        for i, curso in enumerate(sorted(df["curso"].unique())):
-            dados_curso = df[df["curso"] == curso]
-            desistentes_por_ano = dados_curso.groupby("ano").apply(lambda x: x.iloc[:, 4:].sum().sum())
-            color = self.colors[list(self.df["curso"].unique()).index(curso)]
-            ax.plot(desistentes_por_ano.index, desistentes_por_ano.values, 
-                    label=curso, color=color, marker='o')
-        
-        ax.set_xlabel("Ano")
-        ax.set_ylabel("Total de Desistências")
-        ax.set_title("Tendência de Desistências por Curso")
-        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        ax.grid(True)
-        
-        fig.tight_layout()
-        canvas = FigureCanvas(fig)
-        return canvas
-    
+        self.bar_axis_y = QValueAxis()
+        chart.addAxis(self.bar_axis_y, Qt.AlignLeft)
+        self.bar_series.attachAxis(self.bar_axis_y)
+
+        bar_view = QChartView(chart)
+        bar_view.setRenderHint(QPainter.Antialiasing)
+        self.bar_view = bar_view
+        # Número de barras da última renderização; o redimensionamento reagrupa os anos
+        self.bar_max_bars = None
+        bar_view.installEventFilter(self)
+        self.add_chart_tab(bar_view, "Desistências por Ano",
+                           lambda: self.update_bar_chart(self.cube.dropouts_by_year(**self.filters)))
+
+    def update_bar_chart(self, dropouts_by_year):
+        """
+        Atualiza os valores das barras, incluindo/removendo apenas os anos afetados.
+
+        Quando há mais anos do que cabem na largura do gráfico, os anos consecutivos
+        são agrupados em faixas (ex.: "2000–2004").
+        """
+        self.bar_max_bars = self.bar_chart_capacity()
+        dropouts = bucket_years(dropouts_by_year, self.bar_max_bars)
+        for faixa in list(self.bar_sets):
+            if faixa not in dropouts.index:
+                self.bar_series.remove(self.bar_sets.pop(faixa))
+        for faixa, desistentes in dropouts.items():
+            bar_set = self.bar_sets.get(faixa)
+            if bar_set is None:
+                inicio, fim = faixa
+                bar_set = QBarSet(str(inicio) if inicio == fim else f"{inicio}–{fim}")
+                bar_set.append(float(desistentes))
+                # Cor estável por ano inicial, independente do filtro
+                color = self.group_index.color(inicio, column="ano")
+                bar_set.setColor(QColor(plt.matplotlib.colors.rgb2hex(color)))
+                # Mantém as barras em ordem cronológica
+                position = sum(1 for other in self.bar_sets if other < faixa)
+                self.bar_series.insert(position, bar_set)
+                self.bar_sets[faixa] = bar_set
+            elif bar_set.at(0) != desistentes:
+                bar_set.replace(0, float(desistentes))
+        if len(dropouts):
+            self.bar_axis_y.setRange(0, max(float(dropouts.max()), 1.0) * 1.05)
+
+    def bar_chart_capacity(self):
+        """Número de barras que a largura atual do gráfico comporta."""
+        return max(self.bar_view.width() // MIN_BAR_WIDTH, 1)
+
+    def eventFilter(self, obj, event):
+        # Reagrupa os anos quando a largura do gráfico de barras muda a capacidade
+        if (event.type() == QEvent.Resize and obj is getattr(self, "bar_view", None)
+                and self.bar_max_bars is not None and obj not in self.dirty_tabs
+                and self.bar_chart_capacity() != self.bar_max_bars):
+            self.update_bar_chart(self.cube.dropouts_by_year(**self.filters))
+        return super().eventFilter(obj, event)
+
+    def create_line_chart(self):
+        """Cria o gráfico de tendência (Matplotlib) e sua aba."""
+        fig = self.figures.figure("tendencia", figsize=(10, 6))
+        # O ajuste do layout acontece no próprio desenho (draw_idle), não a cada filtro
+        fig.set_layout_engine("tight")
+        self.line_canvas = FigureCanvas(fig)
+        # Roda do mouse aproxima/afasta; o redimensionamento refaz a amostragem
+        self.line_canvas.mpl_connect("scroll_event", self.zoom_line_chart)
+        self.line_canvas.mpl_connect("resize_event", lambda event: self.refresh_line_detail())
+        self.reset_line_chart()
+        self.add_chart_tab(self.line_canvas, "Tendência Temporal",
+                           lambda: self.update_line_chart(self.cube.dropouts_by_course_period(**self.filters)))
+
+    def reset_line_chart(self):
+        """Limpa a figura de tendência no lugar (ex.: ao trocar o tema)."""
+        self.line_ax = self.figures.reset("tendencia")
+        self.lines = {}
+        # Séries completas por curso; as linhas exibem apenas uma amostra delas
+        self.line_data = {}
+        # Pontos por linha da última amostragem e janela (xlim, pontos) da última reamostragem
+        self.line_points = None
+        self.line_window = None
+        # Legenda com todas as linhas já criadas; curso -> entrada (exibida ou oculta)
+        self.line_legend = None
+        self.legend_entries = {}
+        with self.figures.themed():
+            setup_trend_axes(self.line_ax)
+        self.line_ax.callbacks.connect("xlim_changed", self.refresh_line_detail)
+
+    def line_chart_points(self):
+        """Número de pontos por linha que a largura atual do eixo comporta sem sobrepor marcadores."""
+        return max(int(self.line_ax.bbox.width) // MIN_POINT_SPACING, 3)
+
+    def refresh_line_detail(self, ax=None):
+        """Reamostra as linhas visíveis para o intervalo atual do eixo x (ex.: após zoom)."""
+        xmin, xmax = self.line_ax.get_xlim()
+        points = self.line_chart_points()
+        # O autoscale emite xlim_changed mesmo sem mudar o intervalo
+        if (xmin, xmax, points) == self.line_window:
+            return
+        self.line_window = (xmin, xmax, points)
+        for curso, (x, y) in self.line_data.items():
+            line = self.lines[curso]
+            if line.get_visible():
+                start, end = visible_window(x, xmin, xmax)
+                line.set_data(*lttb(x[start:end], y[start:end], points))
+        self.line_canvas.draw_idle()
+
+    def zoom_line_chart(self, event):
+        """Aproxima (ou afasta) o eixo x em torno do cursor."""
+        if event.inaxes is not self.line_ax or event.xdata is None:
+            return
+        factor = 0.8 if event.button == "up" else 1.25
+        xmin, xmax = self.line_ax.get_xlim()
+        self.line_ax.set_xlim(event.xdata - (event.xdata - xmin) * factor,
+                              event.xdata + (xmax - event.xdata) * factor)
+
+    def update_line_chart(self, dropouts_by_course_period):
+        """Atualiza os dados das linhas existentes e oculta as dos cursos filtrados."""
+        with self.figures.themed():
+            changed = self._update_line_chart(dropouts_by_course_period)
+        if changed:
+            self.line_canvas.draw_idle()
+
+    def _update_line_chart(self, dropouts_by_course_period):
+        """
+        Atualiza apenas as linhas cujo curso entrou, saiu ou teve a série alterada.
+        A legenda é criada uma vez com todas as linhas; a cada filtro só a
+        visibilidade das entradas muda.
+        """
+        ax = self.line_ax
+        courses = list(dropouts_by_course_period.columns)
+        shown = set(courses)
+        changed = False
+        for curso, line in self.lines.items():
+            if curso not in shown and line.get_visible():
+                line.set_visible(False)
+                changed = True
+        points = self.line_chart_points()
+        # Com outra largura, todas as amostras precisam ser refeitas
+        resample = points != self.line_points
+        self.line_points = points
+        # Série semestral completa (período contínuo ano + (semestre - 1) / 2)
+        periods = dropouts_by_course_period.index.to_numpy(np.float64)
+        values = dropouts_by_course_period.to_numpy(np.float64)
+        new_lines = False
+        for position, curso in enumerate(courses):
+            present = ~np.isnan(values[:, position])
+            x, y = periods[present], values[present, position]
+            line = self.lines.get(curso)
+            previous = self.line_data.get(curso)
+            same_data = (previous is not None and np.array_equal(previous[0], x)
+                         and np.array_equal(previous[1], y))
+            if line is not None and same_data and not resample:
+                if not line.get_visible():
+                    line.set_visible(True)
+                    changed = True
+                continue
+            self.line_data[curso] = (x, y)
+            # Série completa reduzida à largura do gráfico, preservando picos e vales
+            x_plot, y_plot = lttb(x, y, points)
+            if line is None:
+                line, = ax.plot(x_plot, y_plot,
+                                label=curso, color=self.group_index.color(curso),
+                                marker='o')
+                self.lines[curso] = line
+                new_lines = True
+            else:
+                line.set_data(x_plot, y_plot)
+                line.set_visible(True)
+            changed = True
+
+        if new_lines or self.line_legend is None:
+            self.build_line_legend()
+        if changed:
+            for curso, entry in self.legend_entries.items():
+                entry.set_visible(self.lines[curso].get_visible())
+            ax.relim(visible_only=True)
+            ax.autoscale_view()
+        return changed
+
+    def build_line_legend(self):
+        """Cria a legenda com todas as linhas, guardando a entrada de cada curso."""
+        courses = list(self.lines)
+        self.line_legend = self.line_ax.legend(handles=list(self.lines.values()),
+                                               bbox_to_anchor=(1.05, 1), loc='upper left')
+        # Entradas (marcador + texto) na ordem das linhas; o empacotamento da
+        # legenda ignora as entradas ocultas, sem deixar lacunas
+        entries = [entry for column in self.line_legend._legend_handle_box.get_children()
+                   for entry in column.get_children()]
+        self.legend_entries = dict(zip(courses, entries))
+
     def export_charts(self):
         """Exporta os gráficos presentes nas abas para arquivos PNG ou PDF."""
         from PyQt5.QtWidgets import QFileDialog
+        self.render_all_tabs()
         for i in range(self.tab_widget.count()):
             widget = self.tab_widget.widget(i)
             title = self.tab_widget.tabText(i).replace(" ", "_")
@@ -195,18 +404,20 @@ class Dashboard(QWidget):
     def set_theme(self, is_dark):
         """Aplica o tema escuro ou claro aos gráficos."""
         self.dark_mode = is_dark
+        # O tema do Matplotlib é aplicado apenas às figuras do Dashboard
+        self.figures.set_theme("escuro" if is_dark else "claro")
         if is_dark:
-            plt.style.use('dark_background')
             for chart_view in self.findChildren(QChartView):
                 chart = chart_view.chart()
                 chart.setBackgroundBrush(QColor("#333"))
                 chart.setTitleBrush(QColor("#fff"))
                 chart.legend().setLabelColor(QColor("#fff"))
         else:
-            plt.style.use('default')
             for chart_view in self.findChildren(QChartView):
                 chart = chart_view.chart()
                 chart.setBackgroundBrush(QColor("#fff"))
                 chart.setTitleBrush(QColor("#000"))
                 chart.legend().setLabelColor(QColor("#000"))
-        self.updateCharts()
\ No newline at end of file
+        if hasattr(self, "line_canvas"):
+            self.reset_line_chart()
+            self.updateCharts()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x, y, threshold):
+    """
+    Reduz uma série a `threshold` pontos com Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada balde intermediário, o ponto que
+    forma o maior triângulo com o ponto escolhido anteriormente e a média do balde
+    seguinte, preservando picos e vales visíveis na tela.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        # Média do balde seguinte (no último balde, o próprio ponto final)
+        next_end = min(int((i + 2) * every) + 1, n)
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return x[selected], y[selected]
+
+
+def visible_window(x, xmin, xmax):
+    """Índices [início, fim) dos pontos dentro de [xmin, xmax], com um vizinho de cada lado."""
+    start = max(int(np.searchsorted(x, xmin, side="left")) - 1, 0)
+    end = min(int(np.searchsorted(x, xmax, side="right")) + 1, len(x))
+    return start, end
+
+
+def bucket_years(series, max_bars):
+    """
+    Agrupa uma série indexada por ano em faixas de anos consecutivos (somando os
+    valores) para que haja no máximo `max_bars` barras.
+
+    Retorna uma série indexada por tuplas (ano_inicial, ano_final).
+    """
+    years = np.asarray(series.index)
+    if len(years) == 0:
+        return pd.Series([], index=pd.Index([], dtype=object), dtype=np.float64)
+    width = max(int(np.ceil(len(years) / max(max_bars, 1))), 1)
+    groups = np.arange(len(years)) // width
+    values = series.groupby(groups).sum().to_numpy(np.float64)
+    index = [(int(years[groups == g][0]), int(years[groups == g][-1])) for g in range(groups[-1] + 1)]
+    return pd.Series(values, index=index)
@@ -0,0 +1,171 @@
+"""
+Exportação em lote (sem interface gráfica) dos gráficos do Dashboard.
+
+Renderiza, com o backend Agg do Matplotlib, os três gráficos do Dashboard
+(distribuição, desistências por ano e tendência) para o conjunto completo, para
+cada curso e para cada ano, distribuindo o trabalho entre processos. Os arquivos
+são gravados em uma árvore de diretórios:
+
+    <saida>/geral/<grafico>.<formato>
+    <saida>/por_curso/<curso>/<grafico>.<formato>
+    <saida>/por_ano/<ano>/<grafico>.<formato>
+
+Uso (a partir de app/):
+    python -m ui.export dados.csv -o exportacao --formats png pdf svg [--workers 8]
+"""
+import os
+import re
+import unicodedata
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from data.aggregates import AggregateCube
+from data.group_index import GroupIndex
+from ui.figures import draw_course_distribution, draw_dropouts_by_year, draw_dropout_trend
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SUPPORTED_FORMATS = ("png", "pdf", "svg")
+
+# Gráfico -> (consulta no cubo, função de desenho)
+CHARTS = {
+    "distribuicao": ("rows_by_course", draw_course_distribution),
+    "desistencias_por_ano": ("dropouts_by_year", lambda ax, data, palette: draw_dropouts_by_year(ax, data)),
+    "tendencia": ("dropouts_by_course_year", draw_dropout_trend),
+}
+
+# Estado de cada processo do pool, definido uma única vez por `_init_worker`
+_worker = {}
+
+
+def slugify(value):
+    """Nome de diretório seguro a partir do nome do curso."""
+    # Forma composta (NFC): acentos decompostos não viram "_" no meio da palavra
+    value = unicodedata.normalize("NFC", str(value).strip())
+    slug = re.sub(r"[^\w\-]+", "_", value, flags=re.UNICODE).strip("_")
+    return slug or "sem_nome"
+
+
+def unique_slugs(values):
+    """
+    Nome de diretório único para cada valor. Valores que geram o mesmo nome
+    (diferindo só em acentos, maiúsculas ou pontuação; a comparação ignora
+    maiúsculas por causa de sistemas de arquivos que não as diferenciam)
+    recebem um sufixo numérico, em vez de sobrescreverem os arquivos um do outro.
+    """
+    slugs = {}
+    used = set()
+    for value in values:
+        base = slugify(value)
+        slug, suffix = base, 2
+        while slug.casefold() in used:
+            slug, suffix = f"{base}_{suffix}", suffix + 1
+        if slug != base:
+            logging.warning(f"Nome de diretório '{base}' repetido; '{value}' exportado em '{slug}'.")
+        used.add(slug.casefold())
+        slugs[value] = slug
+    return slugs
+
+
+def _init_worker(cube, palette, formats, dpi):
+    _worker.update(cube=cube, palette=palette, formats=formats, dpi=dpi)
+
+
+def _render_job(job):
+    """Renderiza todos os gráficos de um escopo (ex.: um curso); executado no pool."""
+    directory, filters = job
+    cube, palette = _worker["cube"], _worker["palette"]
+    os.makedirs(directory, exist_ok=True)
+    files = 0
+    # Uma figura por escopo, limpa entre os gráficos (canvas Agg, sem pyplot/GUI)
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    for name, (query, draw) in CHARTS.items():
+        data = getattr(cube, query)(**filters)
+        if data.empty:
+            continue
+        fig.clear()
+        ax = fig.add_subplot()
+        draw(ax, data, palette)
+        fig.tight_layout()
+        for fmt in _worker["formats"]:
+            fig.savefig(os.path.join(directory, f"{name}.{fmt}"), format=fmt, dpi=_worker["dpi"])
+            files += 1
+    return files
+
+
+class ChartExporter:
+    """
+    Exporta os gráficos do Dashboard para todos os cursos e anos, sem diálogos.
+
+    O cubo de agregados é construído uma vez e enviado a cada processo do pool na
+    inicialização; cada tarefa corresponde a um escopo (geral, um curso ou um ano).
+    """
+
+    def __init__(self, df, output_dir="exportacao", formats=("png",), max_workers=None, dpi=100):
+        formats = tuple(fmt.lower() for fmt in formats)
+        invalid = [fmt for fmt in formats if fmt not in SUPPORTED_FORMATS]
+        if invalid:
+            raise ValueError(f"Formato(s) não suportado(s): {invalid}. Use {list(SUPPORTED_FORMATS)}.")
+        if df is None or df.empty:
+            raise ValueError("Nenhum dado para exportar.")
+        self.cube = AggregateCube(df)
+        # Mesmas cores por curso do Dashboard
+        index = GroupIndex(df, columns=["curso"])
+        self.palette = dict(zip(index.values("curso"), index.palette("curso")))
+        self.output_dir = output_dir
+        self.formats = formats
+        self.max_workers = max_workers or os.cpu_count()
+        self.dpi = dpi
+
+    def build_jobs(self):
+        """Lista de (diretório, filtros): geral, por curso e por ano."""
+        cells = self.cube.cells
+        jobs = [(os.path.join(self.output_dir, "geral"), {})]
+        slugs = unique_slugs(sorted(cells["curso"].unique()))
+        for curso, slug in slugs.items():
+            jobs.append((os.path.join(self.output_dir, "por_curso", slug), {"cursos": {curso}}))
+        for ano in sorted(cells["ano"].unique()):
+            jobs.append((os.path.join(self.output_dir, "por_ano", str(ano)), {"ano": ano}))
+        return jobs
+
+    def export(self):
+        """Executa a exportação e retorna estatísticas (arquivos, segundos, arquivos/s)."""
+        jobs = self.build_jobs()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.cube, self.palette, self.formats, self.dpi)) as executor:
+            chunksize = max(len(jobs) // (4 * self.max_workers), 1)
+            files = sum(executor.map(_render_job, jobs, chunksize=chunksize))
+        seconds = time.perf_counter() - start
+        stats = {
+            'escopos': len(jobs),
+            'arquivos': files,
+            'segundos': seconds,
+            'arquivos_por_segundo': files / seconds if seconds else 0.0,
+        }
+        logging.info(f"{files} arquivo(s) de {len(jobs)} escopo(s) exportados em {self.output_dir} "
+                     f"({seconds:.1f}s, {stats['arquivos_por_segundo']:.1f} arquivos/s).")
+        return stats
+
+
+def main():
+    from data.data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="planilha (CSV/Excel) no formato do template")
+    parser.add_argument("-o", "--output", default="exportacao", help="diretório de saída")
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=SUPPORTED_FORMATS)
+    parser.add_argument("--workers", type=int, default=None, help="número de processos")
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args()
+
+    df = DataLoader(file_path=args.input).load_data()
+    ChartExporter(df, args.output, args.formats, args.workers, args.dpi).export()
+
+
+if __name__ == "__main__":
+    main()
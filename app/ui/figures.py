@@ -0,0 +1,106 @@
+import logging
+from contextlib import contextmanager
+import matplotlib
+import numpy as np
+from matplotlib import style
+from matplotlib.figure import Figure
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Estilos do Matplotlib correspondentes aos temas da interface
+THEMES = {
+    "claro": "default",
+    "escuro": "dark_background",
+}
+
+
+class FigureManager:
+    """
+    Mantém uma única `Figure` por gráfico (canvas), reaproveitada a cada atualização.
+
+    As figuras são criadas com `matplotlib.figure.Figure` e não pelo pyplot, portanto
+    não ficam registradas no gerenciador global de figuras e são liberadas junto com
+    o widget que as exibe. O tema é aplicado por figura (via `style.context`), sem
+    alterar o `plt.style` global.
+    """
+
+    def __init__(self, theme="claro"):
+        if theme not in THEMES:
+            raise ValueError(f"Tema desconhecido: {theme}. Use um de {list(THEMES)}.")
+        self.theme = theme
+        self.figures = {}
+
+    @contextmanager
+    def themed(self):
+        """Contexto com os parâmetros de estilo do tema atual (apenas durante o desenho)."""
+        with style.context(THEMES[self.theme]):
+            yield
+
+    def figure(self, key, figsize=(10, 6)):
+        """Retorna a figura associada a `key`, criando-a apenas na primeira chamada."""
+        fig = self.figures.get(key)
+        if fig is None:
+            with self.themed():
+                fig = Figure(figsize=figsize)
+            self.figures[key] = fig
+        return fig
+
+    def reset(self, key):
+        """Limpa a figura no lugar e retorna um novo eixo já com o tema atual."""
+        fig = self.figure(key)
+        with self.themed():
+            fig.clear()
+            fig.set_facecolor(matplotlib.rcParams["figure.facecolor"])
+            fig.set_edgecolor(matplotlib.rcParams["figure.edgecolor"])
+            return fig.add_subplot()
+
+    def set_theme(self, theme):
+        """Altera o tema das figuras gerenciadas; quem as desenha deve chamar `reset`."""
+        if theme not in THEMES:
+            raise ValueError(f"Tema desconhecido: {theme}. Use um de {list(THEMES)}.")
+        self.theme = theme
+
+    def close(self, key):
+        """Descarta a figura associada a `key`."""
+        fig = self.figures.pop(key, None)
+        if fig is not None:
+            fig.clear()
+
+    def close_all(self):
+        for key in list(self.figures):
+            self.close(key)
+
+
+def setup_trend_axes(ax):
+    """Configura títulos e grade do gráfico de tendência de desistências."""
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Total de Desistências")
+    ax.set_title("Tendência de Desistências por Curso")
+    ax.grid(True)
+
+
+def draw_course_distribution(ax, counts, palette):
+    """Desenha a distribuição de registros por curso (pizza)."""
+    ax.pie(counts.to_numpy(), labels=[str(curso) for curso in counts.index],
+           colors=[palette[curso] for curso in counts.index], autopct="%1.1f%%")
+    ax.set_title("Distribuição de Cursos")
+
+
+def draw_dropouts_by_year(ax, dropouts_by_year):
+    """Desenha o total de desistências por ano (barras)."""
+    anos = [str(ano) for ano in dropouts_by_year.index]
+    colors = matplotlib.colormaps["Set3"](np.linspace(0, 1, max(len(anos), 1)))
+    ax.bar(np.arange(len(anos)), dropouts_by_year.to_numpy(), color=colors, tick_label=anos)
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Total de Desistências")
+    ax.set_title("Desistências por Ano")
+
+
+def draw_dropout_trend(ax, dropouts_by_course_year, palette):
+    """Desenha a tendência de desistências por curso (uma linha por coluna)."""
+    setup_trend_axes(ax)
+    for curso in dropouts_by_course_year.columns:
+        desistentes_por_ano = dropouts_by_course_year[curso].dropna()
+        ax.plot(desistentes_por_ano.index, desistentes_por_ano.values,
+                label=curso, color=palette[curso], marker='o')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
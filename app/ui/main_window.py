@@ -2,15 +2,25 @@ import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget,
     QFileDialog, QLabel, QMessageBox, QDialog, QLineEdit, QFormLayout,
-    QTextEdit, QHBoxLayout, QListWidget, QScrollArea, QGroupBox, QSpacerItem, QSizePolicy, QTabWidget, QDockWidget
+    QTextEdit, QHBoxLayout, QListWidget, QScrollArea, QGroupBox, QSpacerItem, QSizePolicy, QTabWidget, QDockWidget,
+    QProgressBar
 )
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QSettings
+from PyQt5.QtCore import QSettings, QThreadPool
 from data.db_manager import DatabaseManager
 from PyQt5.QtCore import Qt
 
 import os
 from data.data_loader import DataLoader
+from data.group_index import GroupIndex
+from prediction.model_registry import ModelRegistry
+from ui.workers import LoadWorker
+
+# Tamanho dos blocos na leitura de CSV/TXT; permite acompanhar o progresso
+CSV_CHUNKSIZE = 100_000
+# Só arquivos a partir deste tamanho são lidos em blocos (com os tipos do template);
+# os menores são lidos de uma vez, como antes
+CSV_STREAMING_MIN_BYTES = 64 * 1024 ** 2
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -18,13 +28,19 @@ class MainWindow(QMainWindow):
         self.setWindowTitle('Gerenciador de Planilhas')
         self.setGeometry(100, 100, 800, 600)  # Ajuste o tamanho se desejar
         self.loaded_data = None
+        self.group_index = None
+        # Modelos treinados persistidos entre análises (mesmos dados não são retreinados)
+        self.model_registry = ModelRegistry()
         self.dark_mode = False  # Variável para controlar o tema
 
         # Cria objeto QSettings para salvamento persistente
         self.settings = QSettings("MinhaEmpresa", "GerenciadorPlanilhas")
         
         self.db_manager = DatabaseManager()
+        self.thread_pool = QThreadPool.globalInstance()
+        self.load_worker = None
         self.initUI()
+        self.init_load_progress()
         self.load_settings()
 
     def initUI(self):
@@ -159,6 +175,87 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(settings_tab, "Configurações Gerais")
 
 
+    def init_load_progress(self):
+        """Cria o indicador de progresso de carregamento na barra de status."""
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(250)
+        self.cancel_load_button = QPushButton("Cancelar")
+        self.cancel_load_button.setIcon(QIcon.fromTheme("process-stop"))
+        self.cancel_load_button.clicked.connect(lambda: self.cancel_loading(show_status=True))
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.statusBar().addPermanentWidget(self.cancel_load_button)
+        self.load_progress.setVisible(False)
+        self.cancel_load_button.setVisible(False)
+
+    def start_loading(self, loader_factory, success_message, error_title, error_status):
+        """Executa o carregamento em segundo plano, mantendo a interface responsiva."""
+        self.cancel_loading()
+        worker = LoadWorker(loader_factory)
+        worker.signals.progress.connect(self.on_load_progress)
+        worker.signals.finished.connect(lambda df: self.on_load_finished(worker, df, success_message))
+        worker.signals.error.connect(lambda message: self.on_load_error(worker, message, error_title, error_status))
+        worker.signals.cancelled.connect(lambda: self.on_load_cancelled(worker))
+        self.load_worker = worker
+
+        self.load_progress.setRange(0, 0)  # indeterminado até o primeiro sinal de progresso
+        self.load_progress.setVisible(True)
+        self.cancel_load_button.setVisible(True)
+        self.status_label.setText("Status: Carregando planilha...")
+        self.thread_pool.start(worker)
+
+    def cancel_loading(self, show_status=False):
+        """
+        Cancela o carregamento em andamento, se houver. `show_status` informa o
+        cancelamento na barra de status (cancelamento pedido pelo usuário).
+        """
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+            self.load_worker = None
+            self.finish_loading()
+            if show_status:
+                self.status_label.setText("Status: Carregamento cancelado.")
+
+    def finish_loading(self):
+        self.load_progress.setVisible(False)
+        self.cancel_load_button.setVisible(False)
+
+    def on_load_progress(self, rows, bytes_read, total_bytes):
+        if total_bytes > 0:
+            # QProgressBar usa int de 32 bits; a escala evita overflow em arquivos grandes
+            # sem perder a resolução de totais pequenos (etapas do carregamento remoto)
+            scale = total_bytes // 2 ** 30 + 1
+            self.load_progress.setRange(0, total_bytes // scale)
+            self.load_progress.setValue(bytes_read // scale)
+        self.load_progress.setFormat(f"%p% - {rows} linhas")
+
+    def on_load_finished(self, worker, df, success_message):
+        if worker is not self.load_worker:
+            return  # resultado de um carregamento substituído ou cancelado
+        self.load_worker = None
+        self.finish_loading()
+        self.loaded_data = df
+        # Índice de grupos construído uma vez por carga e compartilhado pelas análises
+        self.group_index = GroupIndex(df)
+        self.status_label.setText(success_message)
+        report = worker.validation_report
+        if report is not None and not report.is_valid:
+            QMessageBox.warning(self, "Aviso", f"Planilha carregada com problemas de validação:\n{report.summary()}")
+
+    def on_load_error(self, worker, message, error_title, error_status):
+        if worker is not self.load_worker:
+            return
+        self.load_worker = None
+        self.finish_loading()
+        QMessageBox.critical(self, "Erro", f"{error_title}:\n{message}")
+        self.status_label.setText(error_status)
+
+    def on_load_cancelled(self, worker):
+        if worker is not self.load_worker:
+            return  # já tratado em cancel_loading ou substituído por um carregamento mais novo
+        self.load_worker = None
+        self.finish_loading()
+        self.status_label.setText("Status: Carregamento cancelado.")
+
     def show_settings_dialog(self):
         """Exibe um diálogo modal para configurações adicionais, se necessário."""
         dialog = QDialog(self)
@@ -453,14 +550,14 @@ class MainWindow(QMainWindow):
             from prediction.prediction import Predictor
             
             # Criar dashboard com gráficos
-            dashboard = Dashboard(self.loaded_data, self)
+            dashboard = Dashboard(self.loaded_data, self, group_index=self.group_index)
             dashboard.set_theme(self.dark_mode)
             
             # Definir o dashboard como widget central
             self.setCentralWidget(dashboard)
             
             # Realizar previsões
-            predictor = Predictor(self.loaded_data)
+            predictor = Predictor(self.loaded_data, group_index=self.group_index, registry=self.model_registry)
             future_years = range(2024, 2027)  # Próximos 3 anos
             predictor.plot_predictions(future_years)
             
@@ -477,13 +574,13 @@ class MainWindow(QMainWindow):
             options=options
         )
         if file:
-            try:
-                loader = DataLoader(file_path=file)
-                self.loaded_data = loader.load_data()
-                self.status_label.setText(f"Status: {os.path.basename(file)} carregada com sucesso!")
-            except Exception as e:
-                QMessageBox.critical(self, "Erro", f"Erro ao carregar o arquivo:\n{e}")
-                self.status_label.setText("Status: Falha no carregamento da planilha.")
+            chunksize = CSV_CHUNKSIZE if os.path.getsize(file) >= CSV_STREAMING_MIN_BYTES else None
+            self.start_loading(
+                lambda progress: DataLoader(file_path=file, chunksize=chunksize, progress_callback=progress),
+                f"Status: {os.path.basename(file)} carregada com sucesso!",
+                "Erro ao carregar o arquivo",
+                "Status: Falha no carregamento da planilha."
+            )
 
     def remove_spreadsheet(self):
         # Confirmação para evitar remoção acidental
@@ -497,6 +594,7 @@ class MainWindow(QMainWindow):
                 if self.loaded_data is None:
                     raise ValueError("Nenhuma planilha carregada para remoção.")
                 self.loaded_data = None
+                self.group_index = None
                 self.status_label.setText("Status: Planilha removida com sucesso!")
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Erro ao remover a planilha:\n{e}")
@@ -509,15 +607,17 @@ class MainWindow(QMainWindow):
             if auth_result:
                 sheet_url, credentials_path = auth_result
                 
-                # Criar instância do DataLoader com as credenciais do Google Sheets
-                loader = DataLoader(
-                    google_sheet_url=sheet_url,
-                    credentials_path=credentials_path
+                # Carrega os dados em segundo plano com as credenciais do Google Sheets
+                self.start_loading(
+                    lambda progress: DataLoader(
+                        google_sheet_url=sheet_url,
+                        credentials_path=credentials_path,
+                        progress_callback=progress
+                    ),
+                    "Status: Planilha remota conectada com sucesso!",
+                    "Erro ao conectar com planilha remota",
+                    "Status: Falha na conexão com planilha remota."
                 )
-                
-                # Carregar os dados
-                self.loaded_data = loader.load_data()
-                self.status_label.setText(f"Status: Planilha remota conectada com sucesso!")
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao conectar com planilha remota:\n{e}")
             self.status_label.setText("Status: Falha na conexão com planilha remota.")
@@ -0,0 +1,54 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from data.data_loader import LoadCancelled
+
+
+class WorkerSignals(QObject):
+    """Sinais emitidos pelos workers de carregamento (QRunnable não herda de QObject)."""
+    # linhas lidas, bytes lidos, bytes totais; qint64 porque int (32 bits) estoura acima de 2 GiB
+    progress = pyqtSignal('qint64', 'qint64', 'qint64')
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class LoadWorker(QRunnable):
+    """
+    Executa um DataLoader fora da thread da interface.
+
+    `loader_factory` recebe o callback de progresso e retorna o DataLoader a ser
+    executado. O resultado volta para a interface pelo sinal `finished`.
+    """
+
+    def __init__(self, loader_factory):
+        super().__init__()
+        self.loader_factory = loader_factory
+        self.signals = WorkerSignals()
+        self._cancelled = False
+        # Relatório de validação do último carregamento (ver DataLoader.validation_report)
+        self.validation_report = None
+
+    def cancel(self):
+        """Solicita o cancelamento; é atendido no próximo bloco lido ou ao final."""
+        self._cancelled = True
+
+    def _report_progress(self, rows, bytes_read, total_bytes):
+        if self._cancelled:
+            raise LoadCancelled()
+        self.signals.progress.emit(rows, bytes_read, total_bytes)
+
+    def run(self):
+        try:
+            loader = self.loader_factory(self._report_progress)
+            df = loader.load_data()
+            self.validation_report = loader.validation_report
+        except LoadCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+
+        if self._cancelled:
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(df)
@@ -0,0 +1,80 @@
+"""
+Verificação de regressão de memória do Dashboard.
+
+Alterna filtros (cursos e ano) e o tema milhares de vezes, redesenhando o gráfico de
+tendência a cada atualização, e acompanha o RSS do processo. Com uma figura
+reaproveitada por canvas o RSS deve ficar estável; termina com código 1 se o
+crescimento após o aquecimento passar de `--max-growth-mb`.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_figure_memory.py [--updates 2000] [--max-growth-mb 20]
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from PyQt5.QtWidgets import QApplication
+
+import synthetic
+
+
+def rss_mb():
+    """RSS atual do processo em MB (Linux: /proc; demais: pico via resource)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from ui.charts import Dashboard
+
+    dashboard = Dashboard(synthetic.generate(courses=20, years=10, start_year=2015, turnos=["Manhã", "Noite"]))
+    dashboard.resize(1200, 900)
+    dashboard.show()
+    # Mantém a aba de tendência (Matplotlib) visível durante todo o teste
+    dashboard.tab_widget.setCurrentWidget(dashboard.line_canvas)
+    checkboxes = list(dashboard.course_checkboxes.values())
+    years = dashboard.year_filter.count()
+
+    samples = []
+    start = time.perf_counter()
+    for i in range(args.updates):
+        checkboxes[i % len(checkboxes)].toggle()
+        if i % 7 == 0:
+            dashboard.year_filter.setCurrentIndex(i % years)
+        if i % 100 == 0:
+            dashboard.set_theme(not dashboard.dark_mode)
+        app.processEvents()
+        dashboard.line_canvas.draw()
+        if i == args.warmup or (i > args.warmup and i % 250 == 0):
+            samples.append((i, rss_mb()))
+    samples.append((args.updates, rss_mb()))
+    elapsed = time.perf_counter() - start
+
+    for i, rss in samples:
+        print(f"atualização {i:>6}: RSS {rss:8.1f} MB")
+    growth = samples[-1][1] - samples[0][1]
+    print(f"{args.updates} atualizações em {elapsed:.1f}s ({1000 * elapsed / args.updates:.1f} ms/atualização); "
+          f"crescimento após aquecimento: {growth:+.1f} MB")
+    if growth > args.max_growth_mb:
+        print(f"FALHA: crescimento acima de {args.max_growth_mb} MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Verifica que o relatório de validação é o mesmo em carregamentos servidos pelo cache.
+
+Carrega duas vezes a mesma planilha inválida (a segunda vem do cache local ou do
+cache de planilhas remotas) e confere que ambos os carregamentos trazem o
+relatório com as mesmas violações. Sai com código 1 se algum relatório vier
+vazio ou diferente.
+
+Uso:
+    python benchmarks/check_validation_cache.py
+"""
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import synthetic
+from data.data_loader import DataLoader
+
+
+class _Worksheet:
+    """Aba em memória com a interface usada pelo DataLoader (get_all_values)."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get_all_values(self):
+        return self.values
+
+
+def invalid_frame():
+    df = synthetic.generate(courses=3, years=4)
+    df.loc[0, "1° C"] = -1
+    df.loc[1, "semestre"] = 3
+    # Chave duplicada
+    return pd.concat([df, df.iloc[[2]]], ignore_index=True)
+
+
+def check(label, loaders):
+    """Carrega com cada loader e compara os relatórios; retorna True se ok."""
+    reports = []
+    for loader in loaders:
+        loader.load_data()
+        reports.append(loader.validation_report)
+    ok = all(report is not None and not report.is_valid for report in reports)
+    ok = ok and all(report.to_dict() == reports[0].to_dict() for report in reports)
+    rules = sorted(reports[0].rules()) if reports[0] is not None else None
+    print(f"{label:<28} {'ok' if ok else 'FALHOU'}  regras: {rules}")
+    return ok
+
+
+def main():
+    logging.disable(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="evasao_validacao_")
+    try:
+        df = invalid_frame()
+        csv_path = synthetic.write(df, os.path.join(workdir, "invalida.csv"))
+        cache_dir = os.path.join(workdir, "cache_local")
+        results = [
+            check("arquivo local", [DataLoader(file_path=csv_path, local_cache_dir=cache_dir)
+                                    for _ in range(2)]),
+            check("arquivo local (blocos)", [DataLoader(file_path=csv_path, local_cache_dir=cache_dir,
+                                                        chunksize=10) for _ in range(2)]),
+        ]
+
+        values = [list(df.columns)] + df.astype(str).values.tolist()
+        sheet_loaders = []
+        for _ in range(2):
+            loader = DataLoader(google_sheet_url="https://planilha.invalida",
+                                cache_dir=os.path.join(workdir, "cache_planilhas"))
+            loader._load_from_google_sheets = loader._fetch_google_sheet
+            loader.session.version = lambda *args: "v1"
+            loader.session.worksheet = lambda *args: _Worksheet(values)
+            sheet_loaders.append(loader)
+        results.append(check("planilha remota", sheet_loaders))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Suíte de benchmarks do carregamento, processamento, previsão e agregações do Dashboard.
+
+Cada caso é executado `--repeat` vezes (registra o menor tempo) e mais uma vez sob
+tracemalloc para medir o pico de memória alocada. Os resultados podem ser salvos
+como linha de base e comparados em execuções futuras; casos mais lentos ou com
+mais memória que a linha de base além da tolerância são apontados como regressão
+(código de saída 1).
+
+Uso:
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json [--tolerance 0.2]
+    python benchmarks/run_benchmarks.py --rows 1000000 --only carregar_csv processar_taxa
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import synthetic
+from data.data_loader import DataLoader
+from data.data_processor import DataProcessor
+from data.aggregates import AggregateCube
+from prediction.prediction import Predictor
+from prediction.grouped import GroupedForecaster
+
+
+def build_cases(args, workdir):
+    """Casos de benchmark: nome -> (linhas processadas, função medida)."""
+    df = synthetic.generate(rows=args.rows, years=args.years, seed=args.seed)
+    matriculados = synthetic.generate_enrollments(df)
+    csv_path = synthetic.write(df, os.path.join(workdir, "dados.csv"))
+    excel_df = df.iloc[:args.excel_rows]
+    excel_path = synthetic.write(excel_df, os.path.join(workdir, "dados.xlsx"))
+    predict_df = synthetic.generate(rows=args.predict_rows, years=args.years, seed=args.seed)
+    cube = AggregateCube(df)
+    cursos = set(cube.cells["curso"].unique()[::2])
+
+    def clean():
+        return DataProcessor(df.copy(deep=False)).clean_data()
+
+    def train():
+        return Predictor(predict_df).train_models()
+
+    def predict():
+        predictor = Predictor(predict_df)
+        predictor.train_models()
+        return predictor.predict(range(2024, 2027))
+
+    def search():
+        return Predictor(predict_df).search_models()
+
+    def grouped():
+        return GroupedForecaster(predict_df).forecast(range(2024, 2027))
+
+    def dashboard():
+        # Construção do cubo + consultas de uma mudança de filtro (cursos e ano)
+        cube = AggregateCube(df)
+        for filters in ({}, {"cursos": cursos}, {"cursos": cursos, "ano": int(df["ano"].iloc[0])}):
+            cube.rows_by_course(**filters)
+            cube.dropouts_by_year(**filters)
+            cube.dropouts_by_course_year(**filters)
+
+    return {
+        "carregar_csv": (len(df), lambda: DataLoader(file_path=csv_path, local_cache_dir=None).load_data()),
+        "carregar_csv_blocos": (len(df), lambda: DataLoader(file_path=csv_path, local_cache_dir=None,
+                                                            chunksize=100_000).load_data()),
+        "carregar_excel": (len(excel_df), lambda: DataLoader(file_path=excel_path, local_cache_dir=None).load_data()),
+        "processar_limpeza": (len(df), clean),
+        "processar_taxa": (len(df), lambda: DataProcessor(df, matriculados).calculate_dropout_rate()),
+        "processar_taxa_agrupada": (len(df), lambda: DataProcessor(df, matriculados).calculate_dropout_rate(
+            group_by=["curso", "ano"])),
+        "previsao_treino": (len(predict_df), train),
+        "previsao_predict": (len(predict_df), predict),
+        "previsao_busca": (len(predict_df), search),
+        "previsao_por_grupo": (len(predict_df), grouped),
+        "dashboard_agregacoes": (len(df), dashboard),
+    }
+
+
+def measure(fn, repeat):
+    """Menor tempo em `repeat` execuções e pico de memória (MB) em uma execução extra."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1024 ** 2
+
+
+def compare(results, baseline, tolerance):
+    """Compara com a linha de base; retorna a lista de regressões."""
+    regressions = []
+    print(f"\n{'caso':<26} {'tempo':>9} {'base':>9} {'Δ tempo':>9} {'memória':>10} {'base':>10} {'Δ mem':>8}")
+    for name, result in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            print(f"{name:<26} {result['seconds']:>9.3f} {'-':>9} {'novo':>9}")
+            continue
+        if base.get('rows') != result['rows']:
+            print(f"{name:<26} {result['seconds']:>9.3f} {base['seconds']:>9.3f} "
+                  f"(linhas diferentes: {base.get('rows')} na linha de base; não comparado)")
+            continue
+        dt = result['seconds'] / base['seconds'] - 1 if base['seconds'] else 0.0
+        dm = result['peak_mb'] / base['peak_mb'] - 1 if base['peak_mb'] else 0.0
+        flag = ""
+        if dt > tolerance:
+            flag += " TEMPO"
+        if dm > tolerance:
+            flag += " MEMÓRIA"
+        if flag:
+            regressions.append(name)
+        print(f"{name:<26} {result['seconds']:>9.3f} {base['seconds']:>9.3f} {dt:>+9.0%} "
+              f"{result['peak_mb']:>10.1f} {base['peak_mb']:>10.1f} {dm:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="linhas para carregamento/processamento")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--excel-rows", type=int, default=20_000)
+    parser.add_argument("--predict-rows", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", default=None, help="executa apenas os casos informados")
+    parser.add_argument("--output", default=None, help="grava os resultados desta execução em JSON")
+    parser.add_argument("--save-baseline", default=None, help="grava os resultados como linha de base")
+    parser.add_argument("--baseline", default=None, help="linha de base para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+
+    workdir = tempfile.mkdtemp(prefix="evasao_bench_")
+    try:
+        cases = build_cases(args, workdir)
+        unknown = set(args.only or []) - set(cases)
+        if unknown:
+            parser.error(f"casos desconhecidos: {sorted(unknown)}; disponíveis: {sorted(cases)}")
+
+        results = {}
+        print(f"{'caso':<26} {'linhas':>10} {'segundos':>10} {'linhas/s':>14} {'pico MB':>10}")
+        for name, (rows, fn) in cases.items():
+            if args.only and name not in args.only:
+                continue
+            seconds, peak_mb = measure(fn, args.repeat)
+            results[name] = {'rows': rows, 'seconds': seconds, 'peak_mb': peak_mb}
+            print(f"{name:<26} {rows:>10} {seconds:>10.3f} {rows / seconds:>14,.0f} {peak_mb:>10.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    document = {
+        'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cases': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"Resultados gravados em {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressões acima de {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nSem regressões em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Gerador de dados sintéticos no esquema de transformacao/template.csv.
+
+Produz uma linha por (curso, turno, ano, semestre) com as desistências por ciclo
+("1° C" ... "6° C"), além da tabela de matriculados (entradas) correspondente.
+A escala é controlada pelo número de cursos, de anos ou diretamente de linhas.
+
+Uso:
+    python benchmarks/synthetic.py --rows 1000000 -o dados_sinteticos.csv
+    python benchmarks/synthetic.py --courses 50 --years 20 -o dados.xlsx
+"""
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from data.schema import KEY_COLUMNS, CYCLE_COLUMNS, TEMPLATE_COLUMNS
+
+TURNOS = ["Manhã", "Tarde", "Noite"]
+
+
+def generate(courses=20, years=10, rows=None, start_year=2010, turnos=TURNOS, seed=0):
+    """
+    Gera um DataFrame no formato do template.
+
+    Com `rows`, o número de cursos é aumentado até atingir `rows` linhas (e o
+    excedente descartado); caso contrário, gera cursos × turnos × anos × 2 semestres.
+    """
+    rng = np.random.default_rng(seed)
+    per_course = len(turnos) * years * 2
+    if rows is not None:
+        courses = max(-(-rows // per_course), 1)
+    total = courses * per_course
+
+    idx = np.arange(total)
+    course_codes = idx // per_course
+    df = pd.DataFrame({
+        "curso": pd.Categorical.from_codes(course_codes, categories=[f"Curso {i:05d}" for i in range(courses)]),
+        "turno": pd.Categorical.from_codes((idx // (years * 2)) % len(turnos), categories=list(turnos)),
+        "semestre": (idx % 2 + 1).astype(np.int8),
+        "ano": (start_year + (idx // 2) % years).astype(np.int16),
+    })
+    # Tendência por curso + ruído, decrescente ao longo dos ciclos
+    base = rng.uniform(5, 40, courses)[course_codes]
+    trend = rng.normal(0, 0.5, courses)[course_codes] * ((idx // 2) % years)
+    for position, col in enumerate(CYCLE_COLUMNS):
+        mean = np.clip((base + trend) / (position + 1), 0, None)
+        df[col] = rng.poisson(mean).astype(np.int16)
+    if rows is not None:
+        df = df.iloc[:rows].reset_index(drop=True)
+    return df[TEMPLATE_COLUMNS]
+
+
+def generate_enrollments(df, seed=1):
+    """Tabela de matriculados (entradas) para as mesmas chaves de `df`."""
+    rng = np.random.default_rng(seed)
+    matriculados = df[KEY_COLUMNS].copy()
+    total = df[CYCLE_COLUMNS].to_numpy().sum(axis=1)
+    matriculados["entradas"] = (total + rng.integers(10, 80, len(df))).astype(np.int32)
+    return matriculados
+
+
+def write(df, path):
+    """Grava em CSV ou Excel conforme a extensão."""
+    if path.endswith(('.xls', '.xlsx')):
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=None, help="número exato de linhas (ajusta os cursos)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="dados_sinteticos.csv")
+    args = parser.parse_args()
+    df = generate(args.courses, args.years, args.rows, seed=args.seed)
+    write(df, args.output)
+    print(f"{len(df)} linhas gravadas em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
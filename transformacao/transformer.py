@@ -0,0 +1,138 @@
+"""
+Transforma planilhas no formato original (um bloco de colunas por semestre) para o
+formato do template.csv (uma linha por curso/turno/semestre/ano).
+
+Uso:
+    python transformer.py dados_originais.xlsx [outras.xlsx | pasta/ ...] -o dados_transformados.csv
+"""
+import os
+import re
+import glob
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CICLOS_TEMPLATE = ['1° C', '2° C', '3° C', '4° C', '5° C', '6° C']
+TEMPLATE_COLUMNS = ['curso', 'turno', 'semestre', 'ano'] + CICLOS_TEMPLATE
+
+# Cabeçalhos do tipo "1° SEMESTRE DE 2019" (nível 0) e "4° C"/"4°C" (nível 1)
+PERIOD_PATTERN = re.compile(r"(\d)\s*°\s*SEMESTRE DE\s*(\d{4})", re.IGNORECASE)
+CYCLE_PATTERN = re.compile(r"(\d)\s*°\s*C\b", re.IGNORECASE)
+
+
+def _find_column(level0, name):
+    for i, label in enumerate(level0):
+        if str(label).strip().upper() == name:
+            return i
+    raise ValueError(f"Coluna '{name}' não encontrada no cabeçalho.")
+
+
+def reshape_wide_to_long(df_raw):
+    """
+    Converte uma planilha com cabeçalho de dois níveis para o formato do template.
+
+    Em vez de derreter a planilha e replicar as colunas fixas para cada coluna de
+    dados, cada coluna (período, ciclo) é copiada diretamente para sua posição em
+    um array (períodos x linhas x ciclos); curso e turno são repetidos por
+    `np.tile`. Linhas sem nenhum valor de ciclo são descartadas.
+    """
+    level0 = [str(label) for label in df_raw.columns.get_level_values(0)]
+    level1 = [str(label) for label in df_raw.columns.get_level_values(1)]
+    col_curso = _find_column(level0, "CURSO")
+    col_turno = _find_column(level0, "TURNO")
+
+    # Interpreta o cabeçalho uma vez por coluna (não por linha)
+    periods = {}
+    targets = []
+    for i, (top, sub) in enumerate(zip(level0, level1)):
+        period = PERIOD_PATTERN.search(top)
+        cycle = CYCLE_PATTERN.search(sub)
+        if i in (col_curso, col_turno) or period is None or cycle is None:
+            continue  # colunas fixas, "Total" e afins
+        cycle_pos = int(cycle.group(1)) - 1
+        if cycle_pos >= len(CICLOS_TEMPLATE):
+            continue
+        key = (int(period.group(2)), int(period.group(1)))  # (ano, semestre)
+        periods.setdefault(key, len(periods))
+        targets.append((i, periods[key], cycle_pos))
+
+    n_rows = len(df_raw)
+    if not periods or n_rows == 0:
+        return pd.DataFrame(columns=TEMPLATE_COLUMNS)
+
+    values = np.full((len(periods), n_rows, len(CICLOS_TEMPLATE)), np.nan)
+    for i, period_pos, cycle_pos in targets:
+        values[period_pos, :, cycle_pos] = pd.to_numeric(df_raw.iloc[:, i], errors='coerce').to_numpy(np.float64)
+
+    period_keys = list(periods)
+    df = pd.DataFrame(values.reshape(-1, len(CICLOS_TEMPLATE)), columns=CICLOS_TEMPLATE)
+    df.insert(0, 'curso', np.tile(df_raw.iloc[:, col_curso].to_numpy(), len(period_keys)))
+    df.insert(1, 'turno', np.tile(df_raw.iloc[:, col_turno].to_numpy(), len(period_keys)))
+    df.insert(2, 'semestre', np.repeat([sem for _, sem in period_keys], n_rows))
+    df.insert(3, 'ano', np.repeat([ano for ano, _ in period_keys], n_rows))
+
+    df = df[df[CICLOS_TEMPLATE].notna().any(axis=1)]
+    return df.sort_values(['curso', 'turno', 'ano', 'semestre'], kind='stable').reset_index(drop=True)
+
+
+def expand_inputs(inputs):
+    """Expande arquivos, pastas e globs em uma lista de pastas de trabalho Excel."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.xls*"))))
+        else:
+            paths.extend(sorted(glob.glob(item)) or [item])
+    return paths
+
+
+def iter_sheets(paths, sheet_name=None):
+    """Percorre as abas das pastas de trabalho uma de cada vez, sem mantê-las em memória."""
+    for path in paths:
+        with pd.ExcelFile(path) as workbook:
+            names = [sheet_name] if sheet_name is not None else workbook.sheet_names
+            for name in names:
+                yield path, name, workbook.parse(name, header=[0, 1])
+
+
+def transform_files(paths, output_path, sheet_name=None):
+    """
+    Transforma todas as abas das pastas de trabalho e grava o CSV no formato do
+    template de forma incremental (uma aba por vez). Retorna estatísticas da execução.
+    """
+    start = time.perf_counter()
+    stats = {'abas': 0, 'linhas': 0, 'erros': []}
+    with open(output_path, 'w', encoding='utf-8', newline='') as output:
+        output.write(",".join(TEMPLATE_COLUMNS) + "\n")
+        for path, name, df_raw in iter_sheets(paths, sheet_name):
+            try:
+                df = reshape_wide_to_long(df_raw)
+            except ValueError as e:
+                logging.error(f"Aba ignorada ({path} / {name}): {e}")
+                stats['erros'].append((path, name, str(e)))
+                continue
+            df.to_csv(output, header=False, index=False)
+            stats['abas'] += 1
+            stats['linhas'] += len(df)
+            logging.info(f"{path} / {name}: {len(df)} linhas transformadas.")
+    stats['segundos'] = time.perf_counter() - start
+    logging.info(f"{stats['linhas']} linhas de {stats['abas']} aba(s) gravadas em {output_path} "
+                 f"({stats['segundos']:.2f}s).")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="pastas de trabalho, pastas ou padrões glob")
+    parser.add_argument("-o", "--output", default="dados_transformados.csv", help="CSV de saída")
+    parser.add_argument("--sheet", default=None, help="processa apenas a aba informada")
+    args = parser.parse_args()
+    transform_files(expand_inputs(args.inputs), args.output, args.sheet)
+
+
+if __name__ == "__main__":
+    main()